@@ -1,21 +1,40 @@
-from flask import Flask, render_template_string, request, jsonify, send_file, session
+from flask import Flask, render_template, render_template_string, request, jsonify, send_file, session, Response, url_for
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+from jinja2 import DictLoader
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.preprocessing import StandardScaler
 import joblib
 import os
+import posixpath
+import re
+import json
+import math
+import argparse
+import csv
+import subprocess
+import sys
 from datetime import datetime
-from fpdf import FPDF
-import matplotlib
-
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import io
-import base64
+import gzip
 import secrets
+import socket
+import sqlite3
+import queue
+import threading
+import time
+import hashlib
+import functools
+import html
+import zipfile
+from types import MappingProxyType
+from collections import OrderedDict, deque
+from bisect import bisect_right
+from collections.abc import Mapping
+from importlib import metadata
+from urllib.parse import urlsplit
+from concurrent.futures import (Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SESSION_SECRET', secrets.token_hex(16))
@@ -23,14 +42,468 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600
 
+MODEL_STORE_DIR = os.environ.get('MODEL_STORE_DIR', 'models')
+MODEL_AUTOBUILD = os.environ.get('MODEL_AUTOBUILD', '1') == '1'
+BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', 2))
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 64))
+BATCH_TIMEOUT_MS = float(os.environ.get('BATCH_TIMEOUT_MS', 1000))
+COMPILED_BATCH_LIMIT = int(os.environ.get('COMPILED_BATCH_LIMIT', 512))
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+REPORT_ARCHIVE_DIR = os.environ.get('REPORT_ARCHIVE_DIR')
+REPORT_CACHE_SIZE = int(os.environ.get('REPORT_CACHE_SIZE', 256))
+REPORT_CACHE_BYTES = int(os.environ.get('REPORT_CACHE_BYTES', 32 * 1024 * 1024))
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+REPORT_JOB_LIMIT = int(os.environ.get('REPORT_JOB_LIMIT', 1024))
+REPORT_WAIT_TIMEOUT = float(os.environ.get('REPORT_WAIT_TIMEOUT', 5))
+REPORT_PREGENERATE = os.environ.get('REPORT_PREGENERATE', '1') == '1'
+REPORT_PROCESSES = int(os.environ.get('REPORT_PROCESSES', 2))
+REPORT_BULK_MAX = int(os.environ.get('REPORT_BULK_MAX', 500))
+REPORT_BULK_TIMEOUT = float(os.environ.get('REPORT_BULK_TIMEOUT', 120))
+PREDICTION_HISTORY_SIZE = int(os.environ.get('PREDICTION_HISTORY_SIZE', 10))
+PAGE_MAX_AGE = int(os.environ.get('PAGE_MAX_AGE', 300))
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'sqlite')
+SESSION_STORE_SIZE = int(os.environ.get('SESSION_STORE_SIZE', 10000))
+STORE_SQLITE_PATH = os.environ.get(
+    'STORE_SQLITE_PATH', os.path.join(app.instance_path, 'store.sqlite3'))
+STORE_REDIS_URL = os.environ.get('STORE_REDIS_URL', 'redis://127.0.0.1:6379/0')
+PREDICTION_STORE_BACKEND = os.environ.get('PREDICTION_STORE_BACKEND', 'sqlite')
+PREDICTION_STORE_SIZE = int(os.environ.get('PREDICTION_STORE_SIZE', 10000))
+PREDICTION_STORE_TTL = float(
+    os.environ.get('PREDICTION_STORE_TTL',
+                   app.config['PERMANENT_SESSION_LIFETIME']))
+
 DISEASE_MODELS = {}
 SCALERS = {}
-LAST_PREDICTION_CACHE = {}
+COMPILED_MODELS = {}
+ACTIVE_MODEL_VERSION = None
+BATCH_SCHEDULERS = {}
+
+
+class LRUCache:
+    """A thread-safe LRU mapping with an entry bound, a TTL and counters.
+
+    With ``max_bytes`` set, entries are also evicted once the summed
+    ``sizeof`` of the cached values exceeds it.
+    """
+
+    def __init__(self, maxsize, ttl=None, max_bytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.nbytes -= entry[2]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[2]
+            self._entries[key] = (expires, value, size)
+            self.nbytes += size
+            while (len(self._entries) > self.maxsize or
+                   (self.max_bytes and self.nbytes > self.max_bytes)):
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted[2]
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+            if self.max_bytes:
+                stats['bytes'] = self.nbytes
+                stats['max_bytes'] = self.max_bytes
+            return stats
+
+
+PREDICTION_CACHE = LRUCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+# Generated PDFs keyed by report_digest(); bounded by total size since a
+# report with long recommendation lists is several times a short one.
+REPORT_CACHE = LRUCache(REPORT_CACHE_SIZE, max_bytes=REPORT_CACHE_BYTES)
+
+
+class MemoryStore(LRUCache):
+    """Process-local key/value store: an LRUCache of serialized values.
+
+    Only suitable for a single server process; use SQLiteStore to share
+    state between gunicorn workers.
+    """
+
+
+class SQLiteStore:
+    """Key/value store in a SQLite table, shared by every local process.
+
+    Values expire ``ttl`` seconds after they were last set. Expired rows are
+    purged every ``purge_every`` writes, which also trims the table to the
+    ``maxsize`` rows that expire last.
+    """
+
+    def __init__(self, path, table, ttl, maxsize=None, purge_every=256):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.purge_every = purge_every
+        self._writes = 0
+        self._local = threading.local()
+
+    def _connect(self):
+        # sqlite3 connections must stay in the thread (and process) that
+        # opened them.
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {self.table} '
+                     '(key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                     'expires REAL NOT NULL)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_expires '
+                     f'ON {self.table} (expires)')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            f'SELECT value FROM {self.table} WHERE key = ? AND expires > ?',
+            (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value):
+        conn = self._connect()
+        conn.execute(
+            f'INSERT OR REPLACE INTO {self.table} (key, value, expires) '
+            'VALUES (?, ?, ?)', (key, value, time.time() + self.ttl))
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self.purge(conn)
+
+    def delete(self, key):
+        self._connect().execute(f'DELETE FROM {self.table} WHERE key = ?',
+                                (key,))
+
+    def purge(self, conn=None):
+        conn = conn or self._connect()
+        conn.execute(f'DELETE FROM {self.table} WHERE expires <= ?',
+                     (time.time(),))
+        if self.maxsize:
+            conn.execute(
+                f'DELETE FROM {self.table} WHERE key IN '
+                f'(SELECT key FROM {self.table} ORDER BY expires DESC '
+                'LIMIT -1 OFFSET ?)', (self.maxsize,))
+
+
+class StoreError(Exception):
+    """An error reply from a Redis-protocol store server."""
+
+
+class RedisStore:
+    """Key/value store on a Redis-protocol server, shared across hosts.
+
+    Speaks just enough RESP for GET, SET with an expiry and DEL, over one
+    connection per thread. Keys are namespaced by ``prefix``; beyond the
+    TTL, eviction is left to the server's maxmemory policy.
+    """
+
+    def __init__(self, url, prefix, ttl):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.ttl = max(1, int(ttl))
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        sock = socket.create_connection((self.host, self.port), timeout=5)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = sock.makefile('rwb')
+        if self.password:
+            execute_resp(conn, 'AUTH', self.password)
+        if self.db:
+            execute_resp(conn, 'SELECT', self.db)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _command(self, *args):
+        # Retry once on a fresh connection in case the server dropped an idle
+        # one; error replies are not retried.
+        for attempt in range(2):
+            conn = self._connect()
+            try:
+                return execute_resp(conn, *args)
+            except OSError:
+                self._local.conn = None
+                conn.close()
+                if attempt:
+                    raise
+
+    def get(self, key):
+        value = self._command('GET', self.prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value):
+        self._command('SET', self.prefix + key, value, 'EX', self.ttl)
+
+    def delete(self, key):
+        self._command('DEL', self.prefix + key)
+
+
+def encode_resp(*args):
+    # A command as a RESP array of bulk strings.
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+        parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+    return b''.join(parts)
+
+
+def read_resp(stream):
+    line = stream.readline()
+    if not line.endswith(b'\r\n'):
+        raise ConnectionError('Connection closed by the store server')
+    kind, payload = line[:1], line[1:-2]
+    if kind == b'+':
+        return payload.decode('utf-8')
+    if kind == b'-':
+        raise StoreError(payload.decode('utf-8'))
+    if kind == b':':
+        return int(payload)
+    if kind == b'$':
+        length = int(payload)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError('Connection closed by the store server')
+        return data[:-2]
+    if kind == b'*':
+        length = int(payload)
+        if length < 0:
+            return None
+        return [read_resp(stream) for _ in range(length)]
+    raise StoreError(f'Unexpected reply from the store server: {line!r}')
+
+
+def execute_resp(conn, *args):
+    conn.write(encode_resp(*args))
+    conn.flush()
+    return read_resp(conn)
+
+
+def make_store(backend, table, ttl, maxsize):
+    if backend == 'memory':
+        return MemoryStore(maxsize, ttl)
+    if backend == 'sqlite':
+        return SQLiteStore(STORE_SQLITE_PATH, table, ttl, maxsize)
+    if backend == 'redis':
+        return RedisStore(STORE_REDIS_URL, f'{table}:', ttl)
+    raise ValueError(f'Unknown store backend: {backend!r}')
+
+
+def serve_store(host, port, maxsize):
+    """Run a minimal Redis-protocol server backed by a MemoryStore.
+
+    A local stand-in for Redis: it lets every worker on a host share the
+    redis backends without installing a server. It understands PING, AUTH,
+    SELECT, GET, SET (with EX) and DEL, and keeps at most ``maxsize`` keys.
+    """
+    import socketserver
+
+    store = MemoryStore(maxsize)
+
+    def reply(value):
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, int):
+            return b':%d\r\n' % value
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def dispatch(args):
+        command = args[0].upper() if args else b''
+        if command == b'PING':
+            return b'+PONG\r\n'
+        if command in (b'AUTH', b'SELECT'):
+            return b'+OK\r\n'
+        if command == b'GET' and len(args) == 2:
+            entry = store.get(args[1])
+            if entry is not None and entry[0] and entry[0] < time.monotonic():
+                store.delete(args[1])
+                entry = None
+            return reply(entry[1] if entry is not None else None)
+        if command == b'SET' and len(args) in (3, 5):
+            expires = None
+            if len(args) == 5 and args[3].upper() == b'EX':
+                expires = time.monotonic() + int(args[4])
+            store.set(args[1], (expires, args[2]))
+            return b'+OK\r\n'
+        if command == b'DEL' and len(args) >= 2:
+            deleted = 0
+            for key in args[1:]:
+                if store.get(key) is not None:
+                    store.delete(key)
+                    deleted += 1
+            return reply(deleted)
+        return b"-ERR unknown command or wrong number of arguments\r\n"
+
+    class Handler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            while True:
+                try:
+                    args = read_resp(self.rfile)
+                except (ConnectionError, StoreError, ValueError):
+                    return
+                self.wfile.write(
+                    dispatch(args if isinstance(args, list) else []))
+                self.wfile.flush()
+
+    class Server(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    with Server((host, port), Handler) as server:
+        server.serve_forever()
+
+
+class ServerSideSession(SecureCookieSession):
+    """Session data kept in a store; the cookie only carries ``sid``."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        super().__init__(initial)
+        self.sid = sid
+        self.new = new
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session data server side, keyed by an opaque random cookie.
+
+    The store entry expires after PERMANENT_SESSION_LIFETIME and is written
+    again whenever the cookie is refreshed, so both expire together.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return ServerSideSession(self.serializer.loads(data), sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+                response.vary.add('Cookie')
+            return
+
+        # Requests that never touch the session (charts, API calls) do not
+        # refresh it, which saves a store write per request.
+        if not (session.accessed and self.should_set_cookie(app, session)):
+            return
+
+        self.store.set(session.sid, self.serializer.dumps(dict(session)))
+        response.set_cookie(name,
+                            session.sid,
+                            expires=self.get_expiration_time(app, session),
+                            httponly=self.get_cookie_httponly(app),
+                            domain=domain,
+                            path=path,
+                            secure=self.get_cookie_secure(app),
+                            samesite=self.get_cookie_samesite(app))
+        response.vary.add('Cookie')
+
+
+# SESSION_BACKEND=cookie keeps Flask's signed-cookie sessions.
+if SESSION_BACKEND != 'cookie':
+    app.session_interface = ServerSideSessionInterface(
+        make_store(SESSION_BACKEND, 'sessions',
+                   app.permanent_session_lifetime.total_seconds(),
+                   SESSION_STORE_SIZE))
+
+# Form predictions by id, so downloads work on any worker and a session only
+# needs to carry the id.
+PREDICTION_STORE = make_store(PREDICTION_STORE_BACKEND, 'predictions',
+                              PREDICTION_STORE_TTL, PREDICTION_STORE_SIZE)
 
 
 def train_models():
     global DISEASE_MODELS, SCALERS
 
+    # sklearn is only needed to fit the models; importing it is the single
+    # largest startup cost, so the serving path never does.
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    DISEASE_MODELS = {}
+    SCALERS = {}
+
     np.random.seed(42)
     diabetes_X = np.random.randn(1000, 8)
     diabetes_y = (diabetes_X[:, 0] * 0.3 + diabetes_X[:, 1] * 0.4 +
@@ -88,934 +561,2551 @@ def train_models():
     SCALERS['stroke'] = stroke_scaler
 
 
-def get_recommendations(disease, risk_level, prediction_prob, input_data):
-    recommendations = {
-        'diabetes': {
-            'high': {
-                'lifestyle': [
-                    'Monitor blood glucose levels daily (target: 80-130 mg/dL fasting)',
-                    'Engage in 150 minutes of moderate aerobic activity per week',
-                    'Lose 5-10% of body weight if overweight',
-                    'Check feet daily for cuts, blisters, or infections',
-                    'Schedule regular eye examinations every 6-12 months'
-                ],
-                'diet': [
-                    'Follow a low glycemic index diet (whole grains, legumes, vegetables)',
-                    'Limit refined carbohydrates and sugary foods',
-                    'Include fiber-rich foods (25-30g daily)',
-                    'Control portion sizes and eat at regular intervals',
-                    'Choose lean proteins (fish, chicken, tofu)',
-                    'Avoid sugary beverages and alcohol'
-                ],
-                'medical': [
-                    'Consult an endocrinologist immediately',
-                    'Consider HbA1c test (target: <7%)',
-                    'Regular kidney function tests (creatinine, eGFR)',
-                    'Check lipid profile quarterly',
-                    'Monitor blood pressure (target: <140/90 mmHg)',
-                    'Discuss medication options (metformin, insulin)'
-                ],
-                'prevention': [
-                    'Maintain healthy weight (BMI 18.5-24.9)',
-                    'Stay hydrated (8-10 glasses of water daily)',
-                    'Quit smoking completely',
-                    'Manage stress through yoga or meditation',
-                    'Get 7-8 hours of quality sleep nightly'
-                ]
-            },
-            'medium': {
-                'lifestyle': [
-                    'Monitor blood glucose weekly',
-                    'Exercise 30 minutes daily (walking, cycling, swimming)',
-                    'Maintain a healthy weight',
-                    'Reduce sedentary time (stand every 30 minutes)'
-                ],
-                'diet': [
-                    'Reduce sugar intake significantly',
-                    'Increase vegetable and fruit consumption (5 servings daily)',
-                    'Choose complex carbohydrates over simple sugars',
-                    'Include omega-3 fatty acids (salmon, walnuts, flaxseeds)'
-                ],
-                'medical': [
-                    'Annual comprehensive health checkup',
-                    'Fasting glucose test every 6 months',
-                    'Blood pressure monitoring monthly',
-                    'Consult a nutritionist for meal planning'
-                ],
-                'prevention': [
-                    'Limit processed foods', 'Practice portion control',
-                    'Reduce stress levels', 'Avoid crash diets'
-                ]
-            },
-            'low': {
-                'lifestyle': [
-                    'Maintain regular physical activity (150 min/week)',
-                    'Keep a healthy weight', 'Stay active throughout the day'
-                ],
-                'diet': [
-                    'Continue balanced diet with whole foods',
-                    'Limit added sugars and processed foods',
-                    'Maintain consistent meal timing'
-                ],
-                'medical': [
-                    'Annual health checkup',
-                    'Blood glucose screening every 1-2 years',
-                    'Regular BMI monitoring'
-                ],
-                'prevention': [
-                    'Maintain healthy habits',
-                    'Stay informed about diabetes prevention',
-                    'Family history awareness'
-                ]
-            }
-        },
-        'heart': {
-            'high': {
-                'lifestyle': [
-                    'NO smoking - quit immediately with medical support',
-                    'Exercise 30-45 minutes daily (cardiac rehabilitation program)',
-                    'Reduce stress through meditation and breathing exercises',
-                    'Monitor blood pressure twice daily',
-                    'Limit alcohol consumption (max 1 drink/day for women, 2 for men)'
-                ],
-                'diet': [
-                    'Follow DASH diet (Dietary Approaches to Stop Hypertension)',
-                    'Reduce sodium intake (<1500mg/day)',
-                    'Increase potassium-rich foods (bananas, spinach, beans)',
-                    'Eat fatty fish 2-3 times weekly (omega-3)',
-                    'Limit saturated fats (<6% of total calories)',
-                    'Avoid trans fats completely',
-                    'Include nuts, seeds, and olive oil'
-                ],
-                'medical': [
-                    'URGENT: Consult a cardiologist within 1 week',
-                    'Complete lipid panel (LDL target: <100 mg/dL)',
-                    'ECG and echocardiogram evaluation',
-                    'Stress test if recommended', 'Consider statin therapy',
-                    'Daily aspirin (consult doctor first)',
-                    'Regular BP monitoring (target: <120/80 mmHg)'
-                ],
-                'prevention': [
-                    'Maintain healthy weight (BMI <25)',
-                    'Control diabetes if present', 'Manage stress actively',
-                    'Get adequate sleep (7-9 hours)',
-                    'Know CPR and warning signs of heart attack'
-                ]
-            },
-            'medium': {
-                'lifestyle': [
-                    'Regular aerobic exercise (walking, jogging, cycling)',
-                    'Quit smoking if applicable', 'Limit alcohol intake',
-                    'Stress management techniques'
-                ],
-                'diet': [
-                    'Reduce sodium to <2300mg/day',
-                    'Increase fruits and vegetables',
-                    'Choose whole grains over refined grains',
-                    'Limit red meat consumption'
-                ],
-                'medical': [
-                    'Annual cardiovascular screening',
-                    'Monitor cholesterol levels (every 6 months)',
-                    'Regular blood pressure checks',
-                    'Consult doctor about preventive measures'
-                ],
-                'prevention': [
-                    'Maintain healthy lifestyle', 'Regular health monitoring',
-                    'Family history assessment', 'Weight management'
-                ]
-            },
-            'low': {
-                'lifestyle': [
-                    'Continue regular exercise routine',
-                    'Maintain non-smoking status', 'Manage stress effectively'
-                ],
-                'diet': [
-                    'Balanced heart-healthy diet', 'Moderate sodium intake',
-                    'Regular consumption of fruits and vegetables'
-                ],
-                'medical': [
-                    'Annual health checkup',
-                    'Cholesterol screening every 3-5 years',
-                    'Blood pressure monitoring'
-                ],
-                'prevention': [
-                    'Maintain healthy weight', 'Stay active', 'Avoid smoking',
-                    'Limit alcohol'
-                ]
-            }
-        },
-        'liver': {
-            'high': {
-                'lifestyle': [
-                    'STOP alcohol consumption immediately',
-                    'Avoid all hepatotoxic substances',
-                    'Get vaccinated for Hepatitis A and B',
-                    'Regular gentle exercise (avoid overexertion)',
-                    'Maintain personal hygiene strictly'
-                ],
-                'diet': [
-                    'Low-fat, high-protein diet',
-                    'Avoid raw or undercooked seafood',
-                    'Limit salt intake (<1500mg/day)',
-                    'Include liver-friendly foods (leafy greens, berries, nuts)',
-                    'Drink plenty of water (2-3 liters daily)',
-                    'Avoid processed and fried foods',
-                    'Consider coffee (2-3 cups daily - shown to be beneficial)'
-                ],
-                'medical': [
-                    'URGENT: See a hepatologist/gastroenterologist immediately',
-                    'Liver function tests (ALT, AST, bilirubin)',
-                    'Abdominal ultrasound or FibroScan',
-                    'Hepatitis screening (A, B, C)',
-                    'Consider liver biopsy if recommended',
-                    'Medication review (avoid NSAIDs, acetaminophen)',
-                    'Regular monitoring every 3 months'
-                ],
-                'prevention': [
-                    'Avoid exposure to toxins and chemicals',
-                    'Never share needles or personal items',
-                    'Practice safe hygiene', 'Weight management if obese',
-                    'Control diabetes and cholesterol'
-                ]
-            },
-            'medium': {
-                'lifestyle': [
-                    'Limit alcohol consumption significantly',
-                    'Regular moderate exercise',
-                    'Avoid unnecessary medications', 'Maintain healthy weight'
-                ],
-                'diet': [
-                    'Reduce fatty foods', 'Increase fiber intake',
-                    'Include antioxidant-rich foods', 'Limit processed foods'
-                ],
-                'medical': [
-                    'Liver function tests every 6 months',
-                    'Annual hepatitis screening',
-                    'Consult doctor about liver health',
-                    'Review medications with physician'
-                ],
-                'prevention': [
-                    'Moderate alcohol or abstain', 'Healthy diet',
-                    'Regular exercise', 'Avoid hepatotoxic substances'
-                ]
-            },
-            'low': {
-                'lifestyle': [
-                    'Maintain moderate alcohol consumption or abstain',
-                    'Regular exercise', 'Healthy weight maintenance'
-                ],
-                'diet': [
-                    'Balanced diet with vegetables and fruits',
-                    'Moderate fat intake', 'Adequate hydration'
-                ],
-                'medical': [
-                    'Routine health checkups',
-                    'Liver function screening as needed',
-                    'Hepatitis vaccination if not done'
-                ],
-                'prevention': [
-                    'Continue healthy habits', 'Limit alcohol',
-                    'Avoid hepatotoxic medications'
-                ]
-            }
-        },
-        'kidney': {
-            'high': {
-                'lifestyle': [
-                    'Monitor blood pressure strictly (target: <130/80)',
-                    'Regular gentle exercise (walking, swimming)',
-                    'Quit smoking immediately',
-                    'Limit strenuous physical activity',
-                    'Stay well-hydrated unless fluid restriction advised'
-                ],
-                'diet': [
-                    'Low-protein diet (0.6-0.8g/kg body weight)',
-                    'Restrict sodium (<2000mg/day)',
-                    'Limit potassium (avoid bananas, oranges, tomatoes)',
-                    'Restrict phosphorus (limit dairy, nuts, beans)',
-                    'Avoid NSAIDs and nephrotoxic medications',
-                    'Monitor fluid intake if recommended',
-                    'Choose kidney-friendly foods (cabbage, bell peppers, onions)'
-                ],
-                'medical': [
-                    'URGENT: Consult a nephrologist immediately',
-                    'Kidney function tests (creatinine, eGFR, BUN)',
-                    'Urinalysis for protein and blood', 'Renal ultrasound',
-                    'Monitor for anemia (CBC)',
-                    'Bone health assessment (calcium, phosphorus, PTH)',
-                    'Consider ACE inhibitors or ARBs',
-                    'Regular dialysis if eGFR <15'
-                ],
-                'prevention': [
-                    'Control blood sugar if diabetic (HbA1c <7%)',
-                    'Manage hypertension aggressively',
-                    'Avoid nephrotoxic drugs',
-                    'Regular kidney function monitoring',
-                    'Consider kidney transplant evaluation if appropriate'
-                ]
-            },
-            'medium': {
-                'lifestyle': [
-                    'Regular exercise', 'Monitor blood pressure',
-                    'Maintain healthy weight', 'Adequate hydration'
-                ],
-                'diet': [
-                    'Moderate protein intake', 'Reduce sodium consumption',
-                    'Limit processed foods', 'Balanced mineral intake'
-                ],
-                'medical': [
-                    'Kidney function tests annually',
-                    'Blood pressure monitoring', 'Urinalysis yearly',
-                    'Consult doctor about kidney health'
-                ],
-                'prevention': [
-                    'Control diabetes and hypertension',
-                    'Avoid excessive NSAIDs', 'Stay hydrated',
-                    'Regular health screenings'
-                ]
-            },
-            'low': {
-                'lifestyle': [
-                    'Maintain regular exercise', 'Healthy weight management',
-                    'Adequate hydration'
-                ],
-                'diet': [
-                    'Balanced diet', 'Moderate sodium intake',
-                    'Adequate protein'
-                ],
-                'medical': [
-                    'Routine health checkups',
-                    'Periodic kidney function screening',
-                    'Blood pressure monitoring'
-                ],
-                'prevention': [
-                    'Continue healthy lifestyle', 'Monitor blood pressure',
-                    'Control blood sugar', 'Avoid nephrotoxic substances'
-                ]
-            }
-        },
-        'stroke': {
-            'high': {
-                'lifestyle': [
-                    'IMMEDIATE: Know FAST warning signs (Face, Arms, Speech, Time)',
-                    'Control blood pressure strictly (<120/80)',
-                    'Quit smoking immediately',
-                    'Limit alcohol (max 1-2 drinks/day)',
-                    'Regular moderate exercise (30 min daily)',
-                    'Reduce stress through relaxation techniques'
-                ],
-                'diet': [
-                    'DASH or Mediterranean diet',
-                    'Reduce sodium drastically (<1500mg/day)',
-                    'Increase fruits and vegetables (8-10 servings)',
-                    'Omega-3 rich foods (salmon, sardines, walnuts)',
-                    'Limit saturated fats and cholesterol',
-                    'Avoid trans fats completely',
-                    'Include whole grains and legumes'
-                ],
-                'medical': [
-                    'URGENT: See neurologist and cardiologist',
-                    'Carotid artery ultrasound', 'Brain MRI/CT scan',
-                    'Complete cardiovascular workup',
-                    'Antiplatelet therapy (aspirin/clopidogrel)',
-                    'Anticoagulation if atrial fibrillation present',
-                    'Statin therapy for cholesterol',
-                    'Blood pressure medication adjustment',
-                    'Regular monitoring every 3 months'
-                ],
-                'prevention': [
-                    'Control all risk factors aggressively',
-                    'Diabetes management (HbA1c <7%)',
-                    'Maintain healthy weight',
-                    'Treat atrial fibrillation if present',
-                    'Emergency action plan in place',
-                    'Family education on stroke signs'
-                ]
-            },
-            'medium': {
-                'lifestyle': [
-                    'Regular aerobic exercise', 'Blood pressure monitoring',
-                    'Stress management', 'Quit smoking if applicable'
-                ],
-                'diet': [
-                    'Heart-healthy diet', 'Reduce sodium intake',
-                    'Increase fruits and vegetables', 'Limit saturated fats'
-                ],
-                'medical': [
-                    'Annual cardiovascular screening',
-                    'Blood pressure and cholesterol monitoring',
-                    'Consult doctor about stroke prevention',
-                    'Consider antiplatelet therapy if recommended'
-                ],
-                'prevention': [
-                    'Control hypertension and diabetes',
-                    'Maintain healthy lifestyle', 'Regular health checkups',
-                    'Know stroke warning signs'
-                ]
-            },
-            'low': {
-                'lifestyle': [
-                    'Maintain regular exercise', 'Healthy lifestyle habits',
-                    'Stress management'
-                ],
-                'diet': [
-                    'Balanced heart-healthy diet', 'Moderate sodium intake',
-                    'Regular fruit and vegetable consumption'
-                ],
-                'medical': [
-                    'Routine health screenings', 'Blood pressure monitoring',
-                    'Cholesterol checks'
-                ],
-                'prevention': [
-                    'Continue healthy habits', 'Maintain healthy weight',
-                    'Avoid smoking', 'Limit alcohol'
-                ]
-            }
-        }
-    }
+class CompiledForest:
+    """A fitted RandomForestClassifier flattened into contiguous node arrays.
 
-    return recommendations.get(disease, {}).get(
-        risk_level, {
-            'lifestyle': ['Maintain a healthy lifestyle'],
-            'diet': ['Follow a balanced diet'],
-            'medical': ['Regular health checkups'],
-            'prevention': ['Stay informed about disease prevention']
-        })
+    All trees share one set of arrays, so a row (or a batch of rows) is routed
+    through every tree at once with a handful of vectorized NumPy operations
+    and no sklearn validation or joblib dispatch. Leaves point back at
+    themselves with an infinite threshold, which lets every walk run for the
+    same number of steps without branching.
 
+    With ``scaler_folded`` set the thresholds live in raw feature space (see
+    ``fold_scaler``) and rows are scored without a StandardScaler pass.
+    """
 
-def determine_risk_level(probability):
-    if probability >= 0.7:
-        return 'high', 'danger'
-    elif probability >= 0.4:
-        return 'medium', 'warning'
-    else:
-        return 'low', 'success'
+    def __init__(self, feature, threshold, children_left, children_right,
+                 value, roots, max_depth, classes, scaler_folded=False):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes = classes
+        self.scaler_folded = scaler_folded
+        # Both children in one (node, went_left) table so each step of the
+        # walk is a single gather.
+        self.children = np.stack([children_right, children_left], axis=1)
 
+    @classmethod
+    def from_estimator(cls, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
 
-def create_gauge_chart(probability, title):
-    fig, ax = plt.subplots(figsize=(6, 3), subplot_kw={'projection': 'polar'})
+            feature = tree.feature.astype(np.intp)
+            threshold = tree.threshold.astype(np.float64)
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+            feature[is_leaf] = 0
+            threshold[is_leaf] = np.inf
 
-    theta = np.linspace(0, np.pi, 100)
+            value = tree.value[:, 0, :].astype(np.float64)
+            value /= value.sum(axis=1, keepdims=True)
 
-    colors_gradient = plt.cm.RdYlGn_r(np.linspace(0, 1, 100))
-    for i in range(99):
-        ax.plot(theta[i:i + 2], [1, 1], color=colors_gradient[i], linewidth=10)
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
 
-    arrow_angle = probability * np.pi
-    ax.annotate('',
-                xy=(arrow_angle, 0.95),
-                xytext=(0, 0),
-                arrowprops=dict(arrowstyle='->', lw=3, color='black'))
+        return cls(feature=np.ascontiguousarray(np.concatenate(features)),
+                   threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+                   children_left=np.ascontiguousarray(
+                       np.concatenate(lefts).astype(np.intp)),
+                   children_right=np.ascontiguousarray(
+                       np.concatenate(rights).astype(np.intp)),
+                   value=np.ascontiguousarray(np.concatenate(values)),
+                   roots=np.array(roots, dtype=np.intp),
+                   max_depth=int(max_depth),
+                   classes=np.asarray(model.classes_))
 
-    ax.set_ylim(0, 1)
-    ax.set_yticks([])
-    ax.set_xticks([0, np.pi / 2, np.pi])
-    ax.set_xticklabels(['0%', '50%', '100%'])
-    ax.set_title(title, fontsize=12, fontweight='bold', pad=20)
-    ax.spines['polar'].set_visible(False)
+    def to_arrays(self):
+        # Persisted as a plain dict of arrays so the artifact does not depend
+        # on the module this class was pickled from (__main__ vs app).
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children_left': self.children_left,
+            'children_right': self.children_right,
+            'value': self.value,
+            'roots': self.roots,
+            'max_depth': self.max_depth,
+            'classes': self.classes,
+            'scaler_folded': self.scaler_folded
+        }
 
-    buf = io.BytesIO()
-    plt.tight_layout()
-    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.read()).decode()
-    plt.close()
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**arrays)
 
-    return img_base64
+    def fold_scaler(self, scaler):
+        if self.scaler_folded:
+            raise ValueError('A scaler is already folded into this forest')
 
+        n_features = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(
+            n_features)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(
+            n_features)
 
-def generate_pdf_report(patient_data, disease, prediction, probability,
-                        recommendations):
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.set_left_margin(15)
-    pdf.set_right_margin(15)
-    pdf.add_page()
+        # (x - mean) / scale <= t  <=>  x <= t * scale + mean, since
+        # StandardScaler never produces a non-positive scale. Leaf
+        # thresholds stay infinite.
+        threshold = self.threshold * scale[self.feature] + mean[self.feature]
 
-    pdf.set_font('Arial', 'B', 20)
-    pdf.set_text_color(0, 102, 204)
-    pdf.cell(0, 15, 'Medical Prediction Report', 0, 1, 'C')
-    pdf.ln(5)
+        return CompiledForest(feature=self.feature,
+                              threshold=np.ascontiguousarray(threshold),
+                              children_left=self.children_left,
+                              children_right=self.children_right,
+                              value=self.value,
+                              roots=self.roots,
+                              max_depth=self.max_depth,
+                              classes=self.classes,
+                              scaler_folded=True)
 
-    pdf.set_font('Arial', '', 10)
-    pdf.set_text_color(100, 100, 100)
-    pdf.cell(
-        0, 5,
-        f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}', 0,
-        1, 'C')
-    pdf.ln(5)
+    def predict_proba(self, X):
+        # sklearn trees compare float32 inputs against float64 thresholds;
+        # casting the same way keeps the splits bit-for-bit identical. Folded
+        # thresholds are compared against the raw float64 inputs.
+        X = np.asarray(X,
+                       dtype=np.float64 if self.scaler_folded else np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        X = np.ascontiguousarray(X)
 
-    pdf.set_draw_color(0, 102, 204)
-    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-    pdf.ln(8)
+        n_rows, n_features = X.shape
+        flat_rows = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = (flat_rows.take(row_offsets + self.feature.take(nodes))
+                       <= self.threshold.take(nodes))
+            nodes = self.children[nodes, go_left.view(np.int8)]
 
-    pdf.set_font('Arial', 'B', 14)
-    pdf.set_text_color(0, 0, 0)
-    pdf.cell(0, 8, 'Patient Information', 0, 1)
-    pdf.ln(2)
+        return self.value.take(nodes, axis=0).mean(axis=1)
 
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(60, 7, f"Name:", 0, 0)
-    pdf.set_font('Arial', 'B', 11)
-    pdf.cell(0, 7, patient_data.get('name', 'N/A'), 0, 1)
+    def predict_with_proba(self, X):
+        proba = self.predict_proba(X)
+        return self.classes[proba.argmax(axis=1)], proba
 
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(60, 7, f"Age:", 0, 0)
-    pdf.set_font('Arial', 'B', 11)
-    pdf.cell(0, 7, patient_data.get('age', 'N/A'), 0, 1)
 
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(60, 7, f"Gender:", 0, 0)
-    pdf.set_font('Arial', 'B', 11)
-    pdf.cell(0, 7, patient_data.get('gender', 'N/A'), 0, 1)
-    pdf.ln(5)
+class BatchScheduler:
+    """Coalesces concurrent single-row predictions for one disease.
 
-    pdf.set_font('Arial', 'B', 14)
-    pdf.set_text_color(0, 0, 0)
-    pdf.cell(0, 8, f'Prediction Results: {disease.upper()}', 0, 1)
-    pdf.ln(2)
+    Callers hand in a feature row and get back a Future. A background thread
+    collects rows for up to ``window`` seconds after the first queued row (or
+    until ``max_batch_size`` rows are queued), scores the stacked matrix with
+    one compiled-forest call and resolves each caller's Future with its own
+    row. The window is only held open while the previous batch had company;
+    otherwise whatever is already queued is scored immediately. A caller
+    whose row is not scored within ``timeout`` seconds scores it itself.
+    """
 
-    risk_level, _ = determine_risk_level(probability)
+    def __init__(self, disease, window, max_batch_size, timeout):
+        self.disease = disease
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
 
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(60, 7, "Prediction:", 0, 0)
-    pdf.set_font('Arial', 'B', 11)
-    if prediction == 1:
-        pdf.set_text_color(220, 53, 69)
-        pdf.cell(0, 7, "POSITIVE - At Risk", 0, 1)
-    else:
-        pdf.set_text_color(40, 167, 69)
-        pdf.cell(0, 7, "NEGATIVE - Low Risk", 0, 1)
+    def submit(self, features):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(features, dtype=np.float64).reshape(-1),
+                         future))
+        return future
 
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(60, 7, "Risk Probability:", 0, 0)
-    pdf.set_font('Arial', 'B', 11)
-    pdf.cell(0, 7, f"{probability*100:.1f}%", 0, 1)
+    def predict(self, features):
+        return self.result(self.submit(features), features)
 
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(60, 7, "Risk Level:", 0, 0)
-    pdf.set_font('Arial', 'B', 11)
-    if risk_level == 'high':
-        pdf.set_text_color(220, 53, 69)
-    elif risk_level == 'medium':
-        pdf.set_text_color(255, 193, 7)
-    else:
-        pdf.set_text_color(40, 167, 69)
-    pdf.cell(0, 7, risk_level.upper(), 0, 1)
-    pdf.ln(5)
+    def result(self, future, features):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A stalled or dead batching thread must not hang the request
+            # thread, so the row is scored here instead.
+            future.cancel()
+            app.logger.warning('Batch scheduler for %s timed out, scoring '
+                               'inline', self.disease)
+            labels, proba = COMPILED_MODELS[self.disease].predict_with_proba(
+                features)
+            return labels[0], proba[0]
 
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font('Arial', 'B', 14)
-    pdf.cell(0, 8, 'Personalized Recommendations', 0, 1)
-    pdf.ln(2)
+    def _ensure_worker(self):
+        # Threads do not survive fork, so every gunicorn worker lazily starts
+        # its own batching thread on its first prediction, and a thread that
+        # has died is replaced.
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run,
+                                            args=(self._queue, ),
+                                            name=f'batch-{self.disease}',
+                                            daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
 
-    if 'lifestyle' in recommendations:
-        pdf.set_font('Arial', 'B', 11)
-        pdf.set_fill_color(230, 240, 255)
-        pdf.cell(0, 7, 'Lifestyle Modifications', 0, 1, 'L', True)
-        pdf.set_font('Arial', '', 9)
-        for i, rec in enumerate(recommendations['lifestyle'], 1):
-            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
-        pdf.ln(2)
+    def _run(self, pending):
+        batch_size = 1
+        while True:
+            batch = [pending.get()]
+            # Only hold the batch open while requests are actually arriving
+            # together, so a lone request under light load never waits.
+            window = self.window if batch_size > 1 else 0
+            deadline = time.monotonic() + window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(pending.get(timeout=remaining))
+                    else:
+                        batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            batch_size = len(batch)
+            self._score(batch)
 
-    if 'diet' in recommendations:
-        pdf.set_font('Arial', 'B', 11)
-        pdf.set_fill_color(255, 240, 230)
-        pdf.cell(0, 7, 'Dietary Recommendations', 0, 1, 'L', True)
-        pdf.set_font('Arial', '', 9)
-        for i, rec in enumerate(recommendations['diet'], 1):
-            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
-        pdf.ln(2)
+    def _score(self, batch):
+        # Skip rows whose caller gave up waiting and scored them itself.
+        batch = [(row, future) for row, future in batch
+                 if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            labels, proba = COMPILED_MODELS[self.disease].predict_with_proba(
+                np.vstack([row for row, _ in batch]))
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
 
-    if 'medical' in recommendations:
-        pdf.set_font('Arial', 'B', 11)
-        pdf.set_fill_color(255, 230, 230)
-        pdf.cell(0, 7, 'Medical Advice', 0, 1, 'L', True)
-        pdf.set_font('Arial', '', 9)
-        for i, rec in enumerate(recommendations['medical'], 1):
-            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
-        pdf.ln(2)
+        for i, (_, future) in enumerate(batch):
+            future.set_result((labels[i], proba[i]))
 
-    if 'prevention' in recommendations:
-        pdf.set_font('Arial', 'B', 11)
-        pdf.set_fill_color(230, 255, 230)
-        pdf.cell(0, 7, 'Prevention Strategies', 0, 1, 'L', True)
-        pdf.set_font('Arial', '', 9)
-        for i, rec in enumerate(recommendations['prevention'], 1):
-            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
-        pdf.ln(2)
 
-    pdf.ln(5)
-    pdf.set_font('Arial', 'I', 9)
-    pdf.set_text_color(150, 150, 150)
-    pdf.multi_cell(
-        0, 5,
-        'Disclaimer: This report is generated by an AI-based prediction system and should not replace professional medical advice. Please consult with a qualified healthcare provider for proper diagnosis and treatment.'
-    )
+def get_batch_scheduler(disease):
+    scheduler = BATCH_SCHEDULERS.get(disease)
+    if scheduler is None:
+        scheduler = BATCH_SCHEDULERS.setdefault(
+            disease,
+            BatchScheduler(disease, BATCH_WINDOW_MS / 1000.0, BATCH_MAX_SIZE,
+                           BATCH_TIMEOUT_MS / 1000.0))
+    return scheduler
 
-    pdf_output = f'reports/{disease}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-    os.makedirs('reports', exist_ok=True)
-    pdf.output(pdf_output)
 
-    return pdf_output
+def score_matrix(disease, features):
+    # Every batch size goes through the same compiled forest as a single
+    # form prediction, so a patient's probability does not depend on the
+    # size of the roster it arrived in. Large matrices are walked in slices
+    # to keep the per-call node arrays small.
+    forest = COMPILED_MODELS[disease]
+    if len(features) <= COMPILED_BATCH_LIMIT:
+        return forest.predict_with_proba(features)
 
+    probabilities = np.vstack([
+        forest.predict_proba(features[start:start + COMPILED_BATCH_LIMIT])
+        for start in range(0, len(features), COMPILED_BATCH_LIMIT)
+    ])
+    return forest.classes[probabilities.argmax(axis=1)], probabilities
 
-HOME_TEMPLATE = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI Disease Prediction System</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        :root {
-            --primary-color: #0066cc;
-            --secondary-color: #00a86b;
-            --danger-color: #dc3545;
-            --warning-color: #ffc107;
-            --dark-color: #1a1a2e;
+
+def score_row(disease, features):
+    if BATCH_MAX_SIZE > 1:
+        return get_batch_scheduler(disease).predict(features)
+    labels, proba = COMPILED_MODELS[disease].predict_with_proba(features)
+    return labels[0], proba[0]
+
+
+class LazyArtifacts(Mapping):
+    """Per-disease joblib artifacts of one model version, loaded on first use.
+
+    Unpickling the sklearn estimators imports sklearn, which dominates cold
+    start, while every prediction is scored by the compiled forests. The
+    estimators are only needed for model verification and for compiling
+    versions published without a compiled forest. They are not memory-mapped:
+    unpickling a tree copies its node arrays, so each process that loads one
+    holds a private copy.
+    """
+
+    def __init__(self, version_dir, suffix, diseases):
+        self._paths = {
+            disease: os.path.join(version_dir, f'{disease}_{suffix}.joblib')
+            for disease in diseases
         }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px 0;
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, disease):
+        path = self._paths[disease]
+        with self._lock:
+            if disease not in self._loaded:
+                self._loaded[disease] = joblib.load(path)
+            return self._loaded[disease]
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+
+def build_model_store(version=None):
+    import shutil
+    import tempfile
+
+    train_models()
+
+    version = version or datetime.now().strftime('%Y%m%d%H%M%S')
+    version_dir = os.path.join(MODEL_STORE_DIR, version)
+    if os.path.exists(version_dir):
+        raise FileExistsError(f'Model version {version} already exists')
+
+    # Write into a scratch directory of this build's own and rename it into
+    # place, so a worker booting mid-build never sees a half-written version
+    # and two builds of the same version never write into one directory.
+    os.makedirs(MODEL_STORE_DIR, exist_ok=True)
+    partial_dir = tempfile.mkdtemp(prefix=f'.{version}.',
+                                   suffix='.partial',
+                                   dir=MODEL_STORE_DIR)
+    try:
+        os.chmod(partial_dir, 0o755)
+        for disease in DISEASE_MODELS:
+            COMPILED_MODELS[disease] = CompiledForest.from_estimator(
+                DISEASE_MODELS[disease]).fold_scaler(SCALERS[disease])
+            joblib.dump(DISEASE_MODELS[disease],
+                        os.path.join(partial_dir, f'{disease}_model.joblib'))
+            joblib.dump(SCALERS[disease],
+                        os.path.join(partial_dir, f'{disease}_scaler.joblib'))
+            joblib.dump(COMPILED_MODELS[disease].to_arrays(),
+                        os.path.join(partial_dir,
+                                     f'{disease}_compiled.joblib'))
+        verify_compiled_models()
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'sklearn_version': metadata.version('scikit-learn'),
+            'diseases': {
+                disease: {
+                    'n_features': int(SCALERS[disease].n_features_in_)
+                }
+                for disease in DISEASE_MODELS
+            }
         }
-        
-        .main-container {
-            max-width: 1200px;
-            margin: 0 auto;
+        with open(os.path.join(partial_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(partial_dir, version_dir)
+    except BaseException:
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        raise
+
+    fd, current_tmp = tempfile.mkstemp(prefix='.CURRENT.', dir=MODEL_STORE_DIR)
+    with os.fdopen(fd, 'w') as f:
+        f.write(version)
+    os.chmod(current_tmp, 0o644)
+    os.replace(current_tmp, os.path.join(MODEL_STORE_DIR, 'CURRENT'))
+
+    return version
+
+
+def autobuild_model_store():
+    # Without preload every worker boots to an empty store. The first to
+    # take the lock builds a version; the others wait for it and load the
+    # version it published instead of building their own.
+    try:
+        import fcntl
+    except ImportError:
+        return build_model_store()
+
+    os.makedirs(MODEL_STORE_DIR, exist_ok=True)
+    with open(os.path.join(MODEL_STORE_DIR, '.build.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return current_model_version() or build_model_store()
+
+
+def verify_compiled_models(n_samples=10000, seed=0):
+    # Check the fused scaler+forest against the two-step sklearn path
+    # (scaler.transform followed by predict_proba) on random probes drawn
+    # around each scaler's training distribution.
+    rng = np.random.default_rng(seed)
+    results = {}
+    for disease, model in DISEASE_MODELS.items():
+        scaler = SCALERS[disease]
+        X = (rng.normal(size=(n_samples, scaler.n_features_in_)) * 2 *
+             scaler.scale_ + scaler.mean_)
+        expected = model.predict_proba(scaler.transform(X))
+        _, proba = COMPILED_MODELS[disease].predict_with_proba(X)
+
+        # The two-step path rounds the scaled row to float32, so a split
+        # sitting within one float32 step of a probe can flip a single tree.
+        tolerance = 1.0 / len(model.estimators_) + 1e-9
+        max_diff = float(np.abs(expected - proba).max())
+        if max_diff > tolerance:
+            raise RuntimeError(
+                f'Compiled {disease} model disagrees with sklearn by '
+                f'{max_diff:.4f}')
+        results[disease] = max_diff
+
+    return results
+
+
+def current_model_version():
+    version = os.environ.get('MODEL_VERSION')
+    if version:
+        return version
+    try:
+        with open(os.path.join(MODEL_STORE_DIR, 'CURRENT')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_models(version=None):
+    global ACTIVE_MODEL_VERSION, DISEASE_MODELS, SCALERS
+
+    version = version or current_model_version()
+    if version is None:
+        if not MODEL_AUTOBUILD:
+            raise RuntimeError(
+                f'No trained models found in {MODEL_STORE_DIR!r}; '
+                'run `python app.py build-models` first')
+        app.logger.warning('No model artifacts found in %r, building them',
+                           MODEL_STORE_DIR)
+        version = autobuild_model_store()
+
+    version_dir = os.path.join(MODEL_STORE_DIR, version)
+    with open(os.path.join(version_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    sklearn_version = metadata.version('scikit-learn')
+    if manifest['sklearn_version'] != sklearn_version:
+        app.logger.warning(
+            'Model version %s was built with scikit-learn %s, running %s',
+            version, manifest['sklearn_version'], sklearn_version)
+
+    # The compiled forests' node arrays are memory-mapped, so workers share
+    # them through the page cache. The few arrays derived at load time (the
+    # children table, and the thresholds of versions whose scaler was not
+    # folded at build time) are built in the preloading master and shared
+    # copy-on-write after fork.
+    models = LazyArtifacts(version_dir, 'model', manifest['diseases'])
+    scalers = LazyArtifacts(version_dir, 'scaler', manifest['diseases'])
+    compiled = {}
+    for disease in manifest['diseases']:
+        compiled_path = os.path.join(version_dir, f'{disease}_compiled.joblib')
+        if os.path.exists(compiled_path):
+            forest = CompiledForest.from_arrays(
+                joblib.load(compiled_path, mmap_mode='r'))
+        else:
+            # Versions published before the compiled evaluator existed.
+            forest = CompiledForest.from_estimator(models[disease])
+        if not forest.scaler_folded:
+            forest = forest.fold_scaler(scalers[disease])
+        compiled[disease] = forest
+
+    DISEASE_MODELS = models
+    SCALERS = scalers
+    COMPILED_MODELS.clear()
+    COMPILED_MODELS.update(compiled)
+    ACTIVE_MODEL_VERSION = version
+    PREDICTION_CACHE.clear()
+
+    return version
+
+
+def freeze(value):
+    # Nested dicts and lists as read-only mappings and tuples.
+    if isinstance(value, dict):
+        return MappingProxyType(
+            {key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+# Static advice per disease and risk level, built once at import.
+RECOMMENDATIONS = freeze({
+    'diabetes': {
+        'high': {
+            'lifestyle': [
+                'Monitor blood glucose levels daily (target: 80-130 mg/dL fasting)',
+                'Engage in 150 minutes of moderate aerobic activity per week',
+                'Lose 5-10% of body weight if overweight',
+                'Check feet daily for cuts, blisters, or infections',
+                'Schedule regular eye examinations every 6-12 months'
+            ],
+            'diet': [
+                'Follow a low glycemic index diet (whole grains, legumes, vegetables)',
+                'Limit refined carbohydrates and sugary foods',
+                'Include fiber-rich foods (25-30g daily)',
+                'Control portion sizes and eat at regular intervals',
+                'Choose lean proteins (fish, chicken, tofu)',
+                'Avoid sugary beverages and alcohol'
+            ],
+            'medical': [
+                'Consult an endocrinologist immediately',
+                'Consider HbA1c test (target: <7%)',
+                'Regular kidney function tests (creatinine, eGFR)',
+                'Check lipid profile quarterly',
+                'Monitor blood pressure (target: <140/90 mmHg)',
+                'Discuss medication options (metformin, insulin)'
+            ],
+            'prevention': [
+                'Maintain healthy weight (BMI 18.5-24.9)',
+                'Stay hydrated (8-10 glasses of water daily)',
+                'Quit smoking completely',
+                'Manage stress through yoga or meditation',
+                'Get 7-8 hours of quality sleep nightly'
+            ]
+        },
+        'medium': {
+            'lifestyle': [
+                'Monitor blood glucose weekly',
+                'Exercise 30 minutes daily (walking, cycling, swimming)',
+                'Maintain a healthy weight',
+                'Reduce sedentary time (stand every 30 minutes)'
+            ],
+            'diet': [
+                'Reduce sugar intake significantly',
+                'Increase vegetable and fruit consumption (5 servings daily)',
+                'Choose complex carbohydrates over simple sugars',
+                'Include omega-3 fatty acids (salmon, walnuts, flaxseeds)'
+            ],
+            'medical': [
+                'Annual comprehensive health checkup',
+                'Fasting glucose test every 6 months',
+                'Blood pressure monitoring monthly',
+                'Consult a nutritionist for meal planning'
+            ],
+            'prevention': [
+                'Limit processed foods', 'Practice portion control',
+                'Reduce stress levels', 'Avoid crash diets'
+            ]
+        },
+        'low': {
+            'lifestyle': [
+                'Maintain regular physical activity (150 min/week)',
+                'Keep a healthy weight', 'Stay active throughout the day'
+            ],
+            'diet': [
+                'Continue balanced diet with whole foods',
+                'Limit added sugars and processed foods',
+                'Maintain consistent meal timing'
+            ],
+            'medical': [
+                'Annual health checkup',
+                'Blood glucose screening every 1-2 years',
+                'Regular BMI monitoring'
+            ],
+            'prevention': [
+                'Maintain healthy habits',
+                'Stay informed about diabetes prevention',
+                'Family history awareness'
+            ]
         }
-        
-        .header {
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            margin-bottom: 30px;
-            text-align: center;
-        }
-        
-        .header h1 {
-            color: var(--primary-color);
-            margin-bottom: 10px;
-            font-weight: bold;
-        }
-        
-        .header p {
-            color: #666;
-            font-size: 1.1rem;
-        }
-        
-        .disease-card {
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            margin-bottom: 20px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            transition: all 0.3s ease;
-            cursor: pointer;
-            border-left: 5px solid;
-        }
-        
-        .disease-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        }
-        
-        .disease-card.diabetes { border-left-color: #e74c3c; }
-        .disease-card.heart { border-left-color: #c0392b; }
-        .disease-card.liver { border-left-color: #d35400; }
-        .disease-card.kidney { border-left-color: #2980b9; }
-        .disease-card.stroke { border-left-color: #8e44ad; }
-        
-        .disease-card h3 {
-            margin-bottom: 15px;
-            font-weight: bold;
-        }
-        
-        .disease-card .icon {
-            font-size: 3rem;
-            margin-bottom: 15px;
-            opacity: 0.8;
+    },
+    'heart': {
+        'high': {
+            'lifestyle': [
+                'NO smoking - quit immediately with medical support',
+                'Exercise 30-45 minutes daily (cardiac rehabilitation program)',
+                'Reduce stress through meditation and breathing exercises',
+                'Monitor blood pressure twice daily',
+                'Limit alcohol consumption (max 1 drink/day for women, 2 for men)'
+            ],
+            'diet': [
+                'Follow DASH diet (Dietary Approaches to Stop Hypertension)',
+                'Reduce sodium intake (<1500mg/day)',
+                'Increase potassium-rich foods (bananas, spinach, beans)',
+                'Eat fatty fish 2-3 times weekly (omega-3)',
+                'Limit saturated fats (<6% of total calories)',
+                'Avoid trans fats completely',
+                'Include nuts, seeds, and olive oil'
+            ],
+            'medical': [
+                'URGENT: Consult a cardiologist within 1 week',
+                'Complete lipid panel (LDL target: <100 mg/dL)',
+                'ECG and echocardiogram evaluation',
+                'Stress test if recommended', 'Consider statin therapy',
+                'Daily aspirin (consult doctor first)',
+                'Regular BP monitoring (target: <120/80 mmHg)'
+            ],
+            'prevention': [
+                'Maintain healthy weight (BMI <25)',
+                'Control diabetes if present', 'Manage stress actively',
+                'Get adequate sleep (7-9 hours)',
+                'Know CPR and warning signs of heart attack'
+            ]
+        },
+        'medium': {
+            'lifestyle': [
+                'Regular aerobic exercise (walking, jogging, cycling)',
+                'Quit smoking if applicable', 'Limit alcohol intake',
+                'Stress management techniques'
+            ],
+            'diet': [
+                'Reduce sodium to <2300mg/day',
+                'Increase fruits and vegetables',
+                'Choose whole grains over refined grains',
+                'Limit red meat consumption'
+            ],
+            'medical': [
+                'Annual cardiovascular screening',
+                'Monitor cholesterol levels (every 6 months)',
+                'Regular blood pressure checks',
+                'Consult doctor about preventive measures'
+            ],
+            'prevention': [
+                'Maintain healthy lifestyle', 'Regular health monitoring',
+                'Family history assessment', 'Weight management'
+            ]
+        },
+        'low': {
+            'lifestyle': [
+                'Continue regular exercise routine',
+                'Maintain non-smoking status', 'Manage stress effectively'
+            ],
+            'diet': [
+                'Balanced heart-healthy diet', 'Moderate sodium intake',
+                'Regular consumption of fruits and vegetables'
+            ],
+            'medical': [
+                'Annual health checkup',
+                'Cholesterol screening every 3-5 years',
+                'Blood pressure monitoring'
+            ],
+            'prevention': [
+                'Maintain healthy weight', 'Stay active', 'Avoid smoking',
+                'Limit alcohol'
+            ]
         }
-        
-        .disease-card.diabetes .icon { color: #e74c3c; }
-        .disease-card.heart .icon { color: #c0392b; }
-        .disease-card.liver .icon { color: #d35400; }
-        .disease-card.kidney .icon { color: #2980b9; }
-        .disease-card.stroke .icon { color: #8e44ad; }
-        
-        .feature-badge {
-            display: inline-block;
-            background: #f8f9fa;
-            padding: 5px 12px;
-            border-radius: 20px;
-            font-size: 0.85rem;
-            margin: 3px;
-            color: #666;
+    },
+    'liver': {
+        'high': {
+            'lifestyle': [
+                'STOP alcohol consumption immediately',
+                'Avoid all hepatotoxic substances',
+                'Get vaccinated for Hepatitis A and B',
+                'Regular gentle exercise (avoid overexertion)',
+                'Maintain personal hygiene strictly'
+            ],
+            'diet': [
+                'Low-fat, high-protein diet',
+                'Avoid raw or undercooked seafood',
+                'Limit salt intake (<1500mg/day)',
+                'Include liver-friendly foods (leafy greens, berries, nuts)',
+                'Drink plenty of water (2-3 liters daily)',
+                'Avoid processed and fried foods',
+                'Consider coffee (2-3 cups daily - shown to be beneficial)'
+            ],
+            'medical': [
+                'URGENT: See a hepatologist/gastroenterologist immediately',
+                'Liver function tests (ALT, AST, bilirubin)',
+                'Abdominal ultrasound or FibroScan',
+                'Hepatitis screening (A, B, C)',
+                'Consider liver biopsy if recommended',
+                'Medication review (avoid NSAIDs, acetaminophen)',
+                'Regular monitoring every 3 months'
+            ],
+            'prevention': [
+                'Avoid exposure to toxins and chemicals',
+                'Never share needles or personal items',
+                'Practice safe hygiene', 'Weight management if obese',
+                'Control diabetes and cholesterol'
+            ]
+        },
+        'medium': {
+            'lifestyle': [
+                'Limit alcohol consumption significantly',
+                'Regular moderate exercise',
+                'Avoid unnecessary medications', 'Maintain healthy weight'
+            ],
+            'diet': [
+                'Reduce fatty foods', 'Increase fiber intake',
+                'Include antioxidant-rich foods', 'Limit processed foods'
+            ],
+            'medical': [
+                'Liver function tests every 6 months',
+                'Annual hepatitis screening',
+                'Consult doctor about liver health',
+                'Review medications with physician'
+            ],
+            'prevention': [
+                'Moderate alcohol or abstain', 'Healthy diet',
+                'Regular exercise', 'Avoid hepatotoxic substances'
+            ]
+        },
+        'low': {
+            'lifestyle': [
+                'Maintain moderate alcohol consumption or abstain',
+                'Regular exercise', 'Healthy weight maintenance'
+            ],
+            'diet': [
+                'Balanced diet with vegetables and fruits',
+                'Moderate fat intake', 'Adequate hydration'
+            ],
+            'medical': [
+                'Routine health checkups',
+                'Liver function screening as needed',
+                'Hepatitis vaccination if not done'
+            ],
+            'prevention': [
+                'Continue healthy habits', 'Limit alcohol',
+                'Avoid hepatotoxic medications'
+            ]
         }
-        
-        .btn-predict {
-            background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-            color: white;
-            border: none;
-            padding: 12px 30px;
-            border-radius: 25px;
-            font-weight: bold;
-            transition: all 0.3s ease;
+    },
+    'kidney': {
+        'high': {
+            'lifestyle': [
+                'Monitor blood pressure strictly (target: <130/80)',
+                'Regular gentle exercise (walking, swimming)',
+                'Quit smoking immediately',
+                'Limit strenuous physical activity',
+                'Stay well-hydrated unless fluid restriction advised'
+            ],
+            'diet': [
+                'Low-protein diet (0.6-0.8g/kg body weight)',
+                'Restrict sodium (<2000mg/day)',
+                'Limit potassium (avoid bananas, oranges, tomatoes)',
+                'Restrict phosphorus (limit dairy, nuts, beans)',
+                'Avoid NSAIDs and nephrotoxic medications',
+                'Monitor fluid intake if recommended',
+                'Choose kidney-friendly foods (cabbage, bell peppers, onions)'
+            ],
+            'medical': [
+                'URGENT: Consult a nephrologist immediately',
+                'Kidney function tests (creatinine, eGFR, BUN)',
+                'Urinalysis for protein and blood', 'Renal ultrasound',
+                'Monitor for anemia (CBC)',
+                'Bone health assessment (calcium, phosphorus, PTH)',
+                'Consider ACE inhibitors or ARBs',
+                'Regular dialysis if eGFR <15'
+            ],
+            'prevention': [
+                'Control blood sugar if diabetic (HbA1c <7%)',
+                'Manage hypertension aggressively',
+                'Avoid nephrotoxic drugs',
+                'Regular kidney function monitoring',
+                'Consider kidney transplant evaluation if appropriate'
+            ]
+        },
+        'medium': {
+            'lifestyle': [
+                'Regular exercise', 'Monitor blood pressure',
+                'Maintain healthy weight', 'Adequate hydration'
+            ],
+            'diet': [
+                'Moderate protein intake', 'Reduce sodium consumption',
+                'Limit processed foods', 'Balanced mineral intake'
+            ],
+            'medical': [
+                'Kidney function tests annually',
+                'Blood pressure monitoring', 'Urinalysis yearly',
+                'Consult doctor about kidney health'
+            ],
+            'prevention': [
+                'Control diabetes and hypertension',
+                'Avoid excessive NSAIDs', 'Stay hydrated',
+                'Regular health screenings'
+            ]
+        },
+        'low': {
+            'lifestyle': [
+                'Maintain regular exercise', 'Healthy weight management',
+                'Adequate hydration'
+            ],
+            'diet': [
+                'Balanced diet', 'Moderate sodium intake',
+                'Adequate protein'
+            ],
+            'medical': [
+                'Routine health checkups',
+                'Periodic kidney function screening',
+                'Blood pressure monitoring'
+            ],
+            'prevention': [
+                'Continue healthy lifestyle', 'Monitor blood pressure',
+                'Control blood sugar', 'Avoid nephrotoxic substances'
+            ]
         }
-        
-        .btn-predict:hover {
-            transform: scale(1.05);
-            box-shadow: 0 5px 15px rgba(0,0,0,0.3);
-            color: white;
+    },
+    'stroke': {
+        'high': {
+            'lifestyle': [
+                'IMMEDIATE: Know FAST warning signs (Face, Arms, Speech, Time)',
+                'Control blood pressure strictly (<120/80)',
+                'Quit smoking immediately',
+                'Limit alcohol (max 1-2 drinks/day)',
+                'Regular moderate exercise (30 min daily)',
+                'Reduce stress through relaxation techniques'
+            ],
+            'diet': [
+                'DASH or Mediterranean diet',
+                'Reduce sodium drastically (<1500mg/day)',
+                'Increase fruits and vegetables (8-10 servings)',
+                'Omega-3 rich foods (salmon, sardines, walnuts)',
+                'Limit saturated fats and cholesterol',
+                'Avoid trans fats completely',
+                'Include whole grains and legumes'
+            ],
+            'medical': [
+                'URGENT: See neurologist and cardiologist',
+                'Carotid artery ultrasound', 'Brain MRI/CT scan',
+                'Complete cardiovascular workup',
+                'Antiplatelet therapy (aspirin/clopidogrel)',
+                'Anticoagulation if atrial fibrillation present',
+                'Statin therapy for cholesterol',
+                'Blood pressure medication adjustment',
+                'Regular monitoring every 3 months'
+            ],
+            'prevention': [
+                'Control all risk factors aggressively',
+                'Diabetes management (HbA1c <7%)',
+                'Maintain healthy weight',
+                'Treat atrial fibrillation if present',
+                'Emergency action plan in place',
+                'Family education on stroke signs'
+            ]
+        },
+        'medium': {
+            'lifestyle': [
+                'Regular aerobic exercise', 'Blood pressure monitoring',
+                'Stress management', 'Quit smoking if applicable'
+            ],
+            'diet': [
+                'Heart-healthy diet', 'Reduce sodium intake',
+                'Increase fruits and vegetables', 'Limit saturated fats'
+            ],
+            'medical': [
+                'Annual cardiovascular screening',
+                'Blood pressure and cholesterol monitoring',
+                'Consult doctor about stroke prevention',
+                'Consider antiplatelet therapy if recommended'
+            ],
+            'prevention': [
+                'Control hypertension and diabetes',
+                'Maintain healthy lifestyle', 'Regular health checkups',
+                'Know stroke warning signs'
+            ]
+        },
+        'low': {
+            'lifestyle': [
+                'Maintain regular exercise', 'Healthy lifestyle habits',
+                'Stress management'
+            ],
+            'diet': [
+                'Balanced heart-healthy diet', 'Moderate sodium intake',
+                'Regular fruit and vegetable consumption'
+            ],
+            'medical': [
+                'Routine health screenings', 'Blood pressure monitoring',
+                'Cholesterol checks'
+            ],
+            'prevention': [
+                'Continue healthy habits', 'Maintain healthy weight',
+                'Avoid smoking', 'Limit alcohol'
+            ]
         }
-        
-        .info-section {
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            margin-top: 20px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
+    }
+})
+
+DEFAULT_RECOMMENDATIONS = freeze({
+    'lifestyle': ['Maintain a healthy lifestyle'],
+    'diet': ['Follow a balanced diet'],
+    'medical': ['Regular health checkups'],
+    'prevention': ['Stay informed about disease prevention']
+})
+
+# Advice for the patient's own values. Each feature maps to bands given by
+# their lower bound, in increasing order: a value at or above a bound (and
+# below the next one) adds that band's item to its category. A category of
+# None ends the previous band. Every band starts above 0, so a field that was
+# left empty never matches.
+RECOMMENDATION_RULE_SPECS = {
+    'diabetes': {
+        'glucose': (
+            (100, 'medical', 'Your glucose of {value:g} mg/dL is in the prediabetes range (100-125); repeat a fasting test within 3 months'),
+            (126, 'medical', 'Your glucose of {value:g} mg/dL is in the diabetic range; ask your doctor about an HbA1c test'),
+            (200, 'medical', 'Your glucose of {value:g} mg/dL is very high; seek medical care promptly'),
+        ),
+        'bmi': (
+            (25, 'lifestyle', 'Your BMI of {value:g} is in the overweight range; losing 5-7% of body weight lowers your diabetes risk'),
+            (30, 'lifestyle', 'Your BMI of {value:g} is in the obese range; ask about a structured weight-loss program'),
+            (40, 'medical', 'Your BMI of {value:g} is in the severely obese range; discuss medical weight-loss options with your doctor'),
+        ),
+        'blood_pressure': (
+            (80, 'diet', 'Your diastolic blood pressure of {value:g} mm Hg is raised; keep sodium under 2,300 mg a day'),
+            (90, 'medical', 'Your diastolic blood pressure of {value:g} mm Hg is in the hypertensive range; have it rechecked and treated'),
+        ),
+    },
+    'heart': {
+        'chol': (
+            (200, 'diet', 'Your cholesterol of {value:g} mg/dL is borderline high; cut saturated fat and add soluble fiber'),
+            (240, 'medical', 'Your cholesterol of {value:g} mg/dL is high; ask your doctor about a full lipid panel and statin therapy'),
+        ),
+        'trestbps': (
+            (130, 'diet', 'Your resting blood pressure of {value:g} mm Hg is raised; follow the DASH diet and limit sodium'),
+            (140, 'medical', 'Your resting blood pressure of {value:g} mm Hg is in the stage 2 hypertension range; discuss medication with your doctor'),
+            (180, 'medical', 'Your resting blood pressure of {value:g} mm Hg is at a crisis level; seek medical care immediately'),
+        ),
+        'oldpeak': (
+            (2, 'medical', 'An exercise ST depression of {value:g} suggests reduced blood flow to the heart; ask about a stress test'),
+        ),
+        'exang': (
+            (1, 'medical', 'You reported chest pain on exercise; avoid strenuous activity until a cardiologist has assessed you'),
+        ),
+        'fbs': (
+            (1, 'diet', 'Your fasting blood sugar is above 120 mg/dL; limit refined carbohydrates and get tested for diabetes'),
+        ),
+    },
+    'liver': {
+        'total_bilirubin': (
+            (1.2, 'medical', 'Your total bilirubin of {value:g} mg/dL is above normal; ask about tests for liver or bile duct problems'),
+        ),
+        'alamine_aminotransferase': (
+            (56, 'medical', 'Your ALT of {value:g} U/L is above normal; review all medications and supplements with your doctor'),
+        ),
+        'aspartate_aminotransferase': (
+            (40, 'lifestyle', 'Your AST of {value:g} U/L is above normal; avoid alcohol completely'),
+        ),
+        'alkaline_phosphotase': (
+            (147, 'medical', 'Your alkaline phosphatase of {value:g} U/L is above normal; ask whether imaging of the bile ducts is needed'),
+        ),
+        'albumin': (
+            (0.1, 'diet', 'Your albumin of {value:g} g/dL is low; make sure you get enough protein at every meal'),
+            (3.5, None, None),
+        ),
+    },
+    'kidney': {
+        'serum_creatinine': (
+            (1.3, 'medical', 'Your serum creatinine of {value:g} mg/dL is above normal; ask for an eGFR test'),
+            (2.0, 'medical', 'Your serum creatinine of {value:g} mg/dL is markedly raised; ask to be referred to a nephrologist'),
+        ),
+        'blood_urea': (
+            (50, 'diet', 'Your blood urea of {value:g} mg/dL is raised; ask a dietitian how much protein you should eat'),
+        ),
+        'potassium': (
+            (5.1, 'diet', 'Your potassium of {value:g} mEq/L is high; limit bananas, oranges, potatoes and salt substitutes'),
+            (6.0, 'medical', 'Your potassium of {value:g} mEq/L is dangerously high; seek medical care today'),
+        ),
+        'sodium': (
+            (0.1, 'medical', 'Your sodium of {value:g} mEq/L is low; review fluid intake and diuretics with your doctor'),
+            (135, None, None),
+            (146, 'diet', 'Your sodium of {value:g} mEq/L is high; drink enough water unless your doctor restricts fluids'),
+        ),
+        'blood_pressure': (
+            (90, 'medical', 'Your blood pressure of {value:g} mm Hg is high; keeping it controlled slows kidney damage'),
+        ),
+        'albumin': (
+            (1, 'medical', 'Protein was found in your urine (albumin level {value:g}); ask about ACE inhibitor or ARB treatment'),
+        ),
+        'sugar': (
+            (1, 'medical', 'Sugar was found in your urine (level {value:g}); get tested for diabetes'),
+        ),
+    },
+    'stroke': {
+        'avg_glucose_level': (
+            (140, 'diet', 'Your average glucose of {value:g} mg/dL is raised; limit sugars and refined carbohydrates'),
+            (200, 'medical', 'Your average glucose of {value:g} mg/dL is high; get tested for diabetes'),
+        ),
+        'bmi': (
+            (25, 'lifestyle', 'Your BMI of {value:g} is in the overweight range; aim to lose 5-10% of your body weight'),
+            (30, 'lifestyle', 'Your BMI of {value:g} is in the obese range; ask about a structured weight-loss program'),
+        ),
+        'hypertension': (
+            (1, 'medical', 'You have hypertension; keeping your blood pressure below 130/80 is the most effective way to prevent a stroke'),
+        ),
+        'heart_disease': (
+            (1, 'medical', 'You have heart disease; ask your doctor whether you need antiplatelet or anticoagulant medication'),
+        ),
+        'smoking_status': (
+            (2, 'prevention', 'You smoke; quitting halves your stroke risk within a few years'),
+            (3, None, None),
+        ),
+    },
+}
+
+
+def compile_recommendation_rules(specs):
+    # {disease: ((column, bounds, bands), ...)}: one bisect over a feature's
+    # bounds picks its band, so a request only evaluates the features that
+    # have rules. bands[0] is the empty band below the lowest bound.
+    compiled = {}
+    for disease, features in specs.items():
+        rules = []
+        for column, spec in features.items():
+            bounds = tuple(bound for bound, _, _ in spec)
+            if list(bounds) != sorted(set(bounds)):
+                raise ValueError(
+                    f'Rule bounds for {disease}/{column} must increase')
+            bands = ((),) + tuple(((category, text),) if category else ()
+                                  for _, category, text in spec)
+            rules.append((column, bounds, bands))
+        compiled[disease] = tuple(rules)
+    return MappingProxyType(compiled)
+
+
+RECOMMENDATION_RULES = compile_recommendation_rules(RECOMMENDATION_RULE_SPECS)
+
+
+def match_recommendation_rules(disease, record):
+    matched = {}
+    for column, bounds, bands in RECOMMENDATION_RULES.get(disease, ()):
+        value = feature_value(record, column)
+        if not math.isfinite(value):
+            # bisect would file NaN and inf in the top band.
+            continue
+        for category, text in bands[bisect_right(bounds, value)]:
+            matched.setdefault(category, []).append(text.format(value=value))
+    return matched
+
+
+# At or above this probability the referral that opens the high risk
+# medical advice is ranked ahead of the advice about the patient's own
+# values; below it the personal advice leads.
+ESCALATION_PROBABILITY = 0.85
+ESCALATION_ADVICE = MappingProxyType({
+    disease: levels['high']['medical'][0]
+    for disease, levels in RECOMMENDATIONS.items()
+})
+
+
+def get_recommendations(disease, risk_level, prediction_prob, input_data):
+    # The static advice for the risk level, led in each category by advice
+    # for the patient's own out-of-range values, except that a very likely
+    # case keeps its referral first. Both the rules and the probability
+    # follow from the feature values, so recommendations cached per feature
+    # vector stay correct.
+    static = RECOMMENDATIONS.get(disease, {}).get(risk_level,
+                                                  DEFAULT_RECOMMENDATIONS)
+    escalate = (prediction_prob is not None and
+                prediction_prob >= ESCALATION_PROBABILITY)
+    recommendations = dict(static)
+    for category, items in match_recommendation_rules(disease, input_data
+                                                      or {}).items():
+        leading = ()
+        rest = static.get(category, ())
+        if (escalate and category == 'medical' and rest and
+                rest[0] == ESCALATION_ADVICE.get(disease)):
+            leading, rest = rest[:1], rest[1:]
+        recommendations[category] = leading + tuple(items) + rest
+    return recommendations
+
+
+FEATURE_COLUMNS = {
+    'diabetes': ('pregnancies', 'glucose', 'blood_pressure', 'skin_thickness',
+                 'insulin', 'bmi', 'dpf', 'age_model'),
+    'heart': ('age', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach',
+              'exang', 'oldpeak', 'slope', 'ca', 'thal'),
+    'liver': ('age', 'gender', 'total_bilirubin', 'direct_bilirubin',
+              'alkaline_phosphotase', 'alamine_aminotransferase',
+              'aspartate_aminotransferase', 'total_proteins', 'albumin',
+              'ag_ratio'),
+    'kidney': ('age', 'blood_pressure', 'specific_gravity', 'albumin', 'sugar',
+               'red_blood_cells', 'pus_cell', 'blood_urea',
+               'serum_creatinine', 'sodium', 'potassium'),
+    # The stroke model was trained with a trailing feature that is always 0.
+    'stroke': ('age', 'hypertension', 'heart_disease', 'ever_married',
+               'work_type', 'residence_type', 'avg_glucose_level', 'bmi',
+               'smoking_status', 'unused')
+}
+
+# Probability cut-offs for the medium and high risk levels, shared by every
+# path that assigns a risk level or draws one.
+MEDIUM_RISK_PROBABILITY = 0.4
+HIGH_RISK_PROBABILITY = 0.7
+
+API_BATCH_MAX_PATIENTS = int(os.environ.get('API_BATCH_MAX_PATIENTS', 10000))
+CSV_CHUNK_ROWS = int(os.environ.get('CSV_CHUNK_ROWS', 5000))
+
+
+def feature_value(record, column):
+    if column == 'gender':
+        return 1.0 if record.get('gender') == 'Male' else 0.0
+    if column == 'unused':
+        return 0.0
+
+    value = record.get(column)
+    if value in (None, '') and column == 'age_model':
+        value = record.get('age')
+    if value in (None, ''):
+        return 0.0
+    return float(value)
+
+
+def prediction_cache_key(disease, features):
+    # Keyed on the parsed feature vector rather than the raw form, so
+    # formatting differences ('80' vs '80.0') and non-model fields such as
+    # the patient's name still hit the same entry.
+    digest = hashlib.blake2b(np.ascontiguousarray(features,
+                                                  dtype=np.float64).tobytes(),
+                             digest_size=16).hexdigest()
+    return (ACTIVE_MODEL_VERSION, disease, digest)
+
+
+def build_features(disease, record):
+    return build_feature_matrix(disease, [record])
+
+
+def build_feature_matrix(disease, records):
+    columns = FEATURE_COLUMNS[disease]
+    features = np.empty((len(records), len(columns)), dtype=np.float64)
+    for i, record in enumerate(records):
+        for j, column in enumerate(columns):
+            features[i, j] = feature_value(record, column)
+    return features
+
+
+def input_fields(disease, record):
+    # (model column, record field) for every input a record has to supply;
+    # the diabetes model's age falls back to the patient's age.
+    for column in FEATURE_COLUMNS[disease]:
+        if column == 'unused':
+            continue
+        if column == 'age_model' and record.get(column) in (None, ''):
+            yield column, 'age'
+        else:
+            yield column, column
+
+
+def missing_fields(disease, record):
+    return [
+        field for _, field in input_fields(disease, record)
+        if record.get(field) in (None, '')
+    ]
+
+
+def invalid_feature(disease, record):
+    # The forms let a blank field count as 0, but a machine client's record
+    # must carry every model input as a finite number. Gender only has to be
+    # present: as on the forms, anything but "Male" (including "Other")
+    # scores as 0. Returns the first offending (field, reason), or None if
+    # the record can be scored.
+    for column, field in input_fields(disease, record):
+        value = record.get(field)
+        if value in (None, ''):
+            return field, 'is missing'
+        if column == 'gender':
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return field, 'is not a number'
+        if not math.isfinite(number):
+            return field, 'is not finite'
+    return None
+
+
+def frame_features(disease, frame):
+    # Vectorized counterpart of build_feature_matrix for a DataFrame of raw
+    # (string) CSV cells. Returns the feature matrix and a mask of rows that
+    # invalid_feature() would reject: a blank, non-numeric or non-finite
+    # model input (every row, if the roster lacks the column).
+    import pandas as pd
+
+    columns = FEATURE_COLUMNS[disease]
+    features = np.zeros((len(frame), len(columns)), dtype=np.float64)
+    invalid = np.zeros(len(frame), dtype=bool)
+    for j, column in enumerate(columns):
+        if column == 'unused':
+            continue
+
+        source = frame.get(column)
+        if column == 'age_model' and 'age' in frame:
+            source = frame['age'] if source is None else source.where(
+                source.notna() & (source != ''), frame['age'])
+        if source is None:
+            invalid[:] = True
+            continue
+        if column == 'gender':
+            features[:, j] = (source == 'Male').to_numpy()
+            invalid |= (source.isna() | (source == '')).to_numpy()
+            continue
+
+        values = pd.to_numeric(source, errors='coerce').to_numpy(
+            dtype=np.float64, na_value=np.nan)
+        finite = np.isfinite(values)
+        invalid |= ~finite
+        features[:, j] = np.where(finite, values, 0)
+
+    return features, invalid
+
+
+def missing_frame_columns(disease, frame):
+    # The model inputs a roster has no column for, by form field name.
+    missing = []
+    for column in FEATURE_COLUMNS[disease]:
+        if column == 'age_model':
+            if column not in frame and 'age' not in frame:
+                missing.append('age')
+        elif column != 'unused' and column not in frame:
+            missing.append(column)
+    return missing
+
+
+def score_frame(disease, frame):
+    import pandas as pd
+
+    features, invalid = frame_features(disease, frame)
+    labels, probabilities = score_matrix(disease, features)
+    probability = probabilities[:, 1]
+    risk_level = np.select([
+        probability >= HIGH_RISK_PROBABILITY,
+        probability >= MEDIUM_RISK_PROBABILITY
+    ], ['high', 'medium'], 'low').astype(object)
+
+    scored = frame.copy()
+    scored['prediction'] = pd.Series(labels, index=frame.index,
+                                     dtype='Int64').mask(invalid)
+    scored['probability'] = pd.Series(probability,
+                                      index=frame.index).mask(invalid)
+    risk_level[invalid] = 'invalid'
+    scored['risk_level'] = risk_level
+    return scored
+
+
+def _init_score_worker():
+    # A forked worker inherits the loaded models; a spawned one (the default
+    # outside Linux) skips create_app() on import and loads them here.
+    if ACTIVE_MODEL_VERSION is None:
+        load_models()
+
+
+def _score_shard(disease, frame, header):
+    return score_frame(disease, frame).to_csv(index=False, header=header)
+
+
+def score_file(disease, input_path, output_path, workers=None,
+               chunk_size=CSV_CHUNK_ROWS):
+    import pandas as pd
+
+    workers = workers or os.cpu_count() or 1
+    reader = pd.read_csv(input_path, dtype=str, chunksize=chunk_size)
+
+    # Shards are scored across the pool but written strictly in submission
+    # order; capping the in-flight shards keeps memory bounded for files of
+    # any size.
+    rows = 0
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_score_worker) as executor, \
+            open(output_path, 'w', newline='') as output:
+        pending = deque()
+        for i, chunk in enumerate(reader):
+            rows += len(chunk)
+            pending.append(
+                executor.submit(_score_shard, disease, chunk, i == 0))
+            if len(pending) >= workers * 2:
+                output.write(pending.popleft().result())
+        while pending:
+            output.write(pending.popleft().result())
+
+    return rows
+
+
+# Screening inputs whose name means something else in another disease's form.
+SCREENING_FIELD_ALIASES = {('kidney', 'albumin'): 'kidney_albumin'}
+
+
+def screening_record(disease, data):
+    record = dict(data)
+    for (alias_disease, column), field in SCREENING_FIELD_ALIASES.items():
+        if alias_disease == disease:
+            record[column] = data.get(field)
+    return record
+
+
+def screening_field(disease, column):
+    return SCREENING_FIELD_ALIASES.get((disease, column), column)
+
+
+def screen_patient(data):
+    # Screening takes whatever measurements the patient has, so a disease
+    # whose inputs are not all present is reported as not assessed rather
+    # than scored with the gaps read as zeros.
+    results = {}
+    features = {}
+    for disease in FEATURE_COLUMNS:
+        record = screening_record(disease, data)
+        missing = missing_fields(disease, record)
+        if missing:
+            results[disease] = {
+                'assessed': False,
+                'missing': [screening_field(disease, field)
+                            for field in missing]
+            }
+            continue
+        problem = invalid_feature(disease, record)
+        if problem is not None:
+            field, reason = problem
+            raise ValueError(f'"{screening_field(disease, field)}" {reason}')
+        features[disease] = build_features(disease, record)
+
+    # Hand all five rows to their batch schedulers before waiting on any, so
+    # the models run concurrently (and batch with other traffic).
+    if BATCH_MAX_SIZE > 1:
+        futures = {
+            disease: get_batch_scheduler(disease).submit(row)
+            for disease, row in features.items()
         }
-        
-        .stats-card {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 10px;
-            text-align: center;
-            margin-bottom: 15px;
+        scores = {
+            disease: get_batch_scheduler(disease).result(
+                future, features[disease])
+            for disease, future in futures.items()
         }
-        
-        .stats-card h4 {
-            font-size: 2rem;
-            margin: 0;
+    else:
+        scores = {
+            disease: score_row(disease, row)
+            for disease, row in features.items()
         }
-        
-        .stats-card p {
-            margin: 5px 0 0 0;
-            opacity: 0.9;
+
+    for disease, (prediction, probabilities) in scores.items():
+        probability = float(probabilities[1])
+        risk_level, badge_color = determine_risk_level(probability)
+        results[disease] = {
+            'assessed': True,
+            'prediction': int(prediction),
+            'probability': probability,
+            'risk_level': risk_level,
+            'badge_color': badge_color
         }
-    </style>
-</head>
-<body>
-    <div class="main-container">
-        <div class="header">
-            <h1><i class="fas fa-heartbeat"></i> AI-Powered Disease Prediction System</h1>
-            <p>Advanced Machine Learning for Early Disease Detection and Prevention</p>
-        </div>
-        
-        <div class="row mb-4">
-            <div class="col-md-3">
-                <div class="stats-card">
-                    <h4>5</h4>
-                    <p>Disease Models</p>
+    # Keep the diseases in their usual order.
+    return {disease: results[disease] for disease in FEATURE_COLUMNS}
+
+
+def determine_risk_level(probability):
+    if probability >= HIGH_RISK_PROBABILITY:
+        return 'high', 'danger'
+    elif probability >= MEDIUM_RISK_PROBABILITY:
+        return 'medium', 'warning'
+    else:
+        return 'low', 'success'
+
+
+# matplotlib's RdYlGn_r colormap (the ColorBrewer RdYlGn stops, reversed),
+# so the gauge keeps its green-to-red sweep without touching matplotlib.
+GAUGE_COLOR_STOPS = ('#006837', '#1a9850', '#66bd63', '#a6d96a', '#d9ef8b',
+                     '#ffffbf', '#fee08b', '#fdae61', '#f46d43', '#d73027',
+                     '#a50026')
+GAUGE_WIDTH = 300
+GAUGE_HEIGHT = 190
+GAUGE_CENTER = (150.0, 165.0)
+GAUGE_RADIUS = 110.0
+
+
+def _gauge_point(angle, radius):
+    cx, cy = GAUGE_CENTER
+    return cx + radius * np.cos(angle), cy - radius * np.sin(angle)
+
+
+@functools.lru_cache(maxsize=None)
+def _gauge_background(title):
+    # Everything but the needle: the 99-segment color arc, the radial grid
+    # lines, tick labels and title. Built once per title.
+    stops = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)]
+                      for color in GAUGE_COLOR_STOPS])
+    positions = np.linspace(0, 1, len(stops))
+    samples = np.linspace(0, 1, 100)
+    colors = np.stack(
+        [np.interp(samples, positions, stops[:, i]) for i in range(3)],
+        axis=1).round().astype(int)
+    theta = np.linspace(0, np.pi, 100)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{GAUGE_WIDTH}" '
+        f'height="{GAUGE_HEIGHT}" viewBox="0 0 {GAUGE_WIDTH} {GAUGE_HEIGHT}" '
+        'font-family="DejaVu Sans, Arial, sans-serif" role="img">',
+        '<defs><marker id="gauge-arrow" viewBox="0 0 10 10" refX="8" '
+        'refY="5" markerWidth="4" markerHeight="4" orient="auto">'
+        '<path d="M0,0 L10,5 L0,10" fill="none" stroke="black" '
+        'stroke-width="2"/></marker></defs>',
+        f'<text x="{GAUGE_CENTER[0]:.0f}" y="20" font-size="16" '
+        f'font-weight="bold" text-anchor="middle">{html.escape(title)}</text>'
+    ]
+    for angle in (0, np.pi / 2, np.pi):
+        x, y = _gauge_point(angle, GAUGE_RADIUS)
+        parts.append(f'<line x1="{GAUGE_CENTER[0]:.1f}" '
+                     f'y1="{GAUGE_CENTER[1]:.1f}" x2="{x:.1f}" y2="{y:.1f}" '
+                     'stroke="#b0b0b0" stroke-width="0.8"/>')
+    for i in range(99):
+        # Overlap each segment into the next so anti-aliasing leaves no seams.
+        x1, y1 = _gauge_point(theta[i], GAUGE_RADIUS - 5)
+        x2, y2 = _gauge_point(min(theta[i + 1] + 0.005, np.pi),
+                              GAUGE_RADIUS - 5)
+        r, g, b = colors[i]
+        parts.append(f'<path d="M{x1:.2f},{y1:.2f} A{GAUGE_RADIUS - 5:.0f},'
+                     f'{GAUGE_RADIUS - 5:.0f} 0 0 0 {x2:.2f},{y2:.2f}" '
+                     f'stroke="#{r:02x}{g:02x}{b:02x}" stroke-width="10" '
+                     'fill="none"/>')
+    for angle, label, anchor in ((0, '0%', 'start'), (np.pi / 2, '50%',
+                                                      'middle'),
+                                 (np.pi, '100%', 'end')):
+        x, y = _gauge_point(angle, GAUGE_RADIUS + 8)
+        parts.append(f'<text x="{x:.1f}" y="{y + 4:.1f}" font-size="13" '
+                     f'text-anchor="{anchor}">{label}</text>')
+
+    return ''.join(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def gauge_fingerprint():
+    # Changes whenever the gauge's look changes, so the long-lived,
+    # immutable chart URLs can be busted with a query parameter.
+    return hashlib.blake2b(create_gauge_chart(0.5, '').encode(),
+                           digest_size=4).hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def gauge_chart_response_body(disease, percent):
+    body = create_gauge_chart(percent / 100,
+                              f"{disease.title()} Risk Assessment").encode()
+    return body, hashlib.sha256(body).hexdigest()
+
+
+def create_gauge_chart(probability, title):
+    # Only the needle depends on the prediction; the background is cached.
+    x, y = _gauge_point(probability * np.pi, (GAUGE_RADIUS - 5) * 0.95)
+    return (f'{_gauge_background(title)}<line x1="{GAUGE_CENTER[0]:.1f}" '
+            f'y1="{GAUGE_CENTER[1]:.1f}" x2="{x:.1f}" y2="{y:.1f}" '
+            'stroke="black" stroke-width="3" '
+            'marker-end="url(#gauge-arrow)"/></svg>')
+
+
+SCREENING_CHART_WIDTH = 560
+SCREENING_CHART_LEFT = 90
+SCREENING_CHART_RIGHT = 530
+SCREENING_CHART_TOP = 40
+SCREENING_CHART_ROW = 36
+
+
+def risk_color(probability):
+    # The gauge's green-to-red sweep sampled at one probability.
+    stops = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)]
+                      for color in GAUGE_COLOR_STOPS])
+    positions = np.linspace(0, 1, len(stops))
+    r, g, b = (int(round(np.interp(probability, positions, stops[:, i])))
+               for i in range(3))
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+@functools.lru_cache(maxsize=None)
+def screening_chart_fingerprint():
+    # Busts the immutable screening chart URLs when the chart's look changes.
+    return hashlib.blake2b(create_screening_chart((('diabetes', 50), )).encode(),
+                           digest_size=4).hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def screening_chart_response_body(percents):
+    body = create_screening_chart(percents).encode()
+    return body, hashlib.sha256(body).hexdigest()
+
+
+def create_screening_chart(percents):
+    # Horizontal risk bars for ((disease, whole percent), ...), with the
+    # medium and high risk cut-offs marked.
+    def x_at(fraction):
+        return SCREENING_CHART_LEFT + fraction * (SCREENING_CHART_RIGHT -
+                                                  SCREENING_CHART_LEFT)
+
+    bottom = SCREENING_CHART_TOP + len(percents) * SCREENING_CHART_ROW
+    height = bottom + 30
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{SCREENING_CHART_WIDTH}" height="{height}" '
+        f'viewBox="0 0 {SCREENING_CHART_WIDTH} {height}" '
+        'font-family="DejaVu Sans, Arial, sans-serif" font-size="13" '
+        'role="img">',
+        f'<text x="{SCREENING_CHART_WIDTH / 2:.0f}" y="22" font-size="15" '
+        'font-weight="bold" text-anchor="middle">'
+        'Risk Probability by Disease</text>'
+    ]
+    for i, (disease, percent) in enumerate(percents):
+        y = SCREENING_CHART_TOP + i * SCREENING_CHART_ROW
+        center = y + SCREENING_CHART_ROW / 2
+        parts.append(f'<text x="{SCREENING_CHART_LEFT - 8}" '
+                     f'y="{center + 4:.0f}" text-anchor="end">'
+                     f'{html.escape(disease.title())}</text>')
+        parts.append(f'<rect x="{SCREENING_CHART_LEFT}" y="{y + 6}" '
+                     f'width="{x_at(percent / 100) - SCREENING_CHART_LEFT:.1f}" '
+                     f'height="{SCREENING_CHART_ROW - 12}" '
+                     f'fill="{risk_color(percent / 100)}"/>')
+        parts.append(f'<text x="{x_at(min(percent / 100 + 0.02, 0.9)):.1f}" '
+                     f'y="{center + 4:.0f}" font-weight="bold">'
+                     f'{percent}%</text>')
+    for fraction, color in ((MEDIUM_RISK_PROBABILITY, '#ffc107'),
+                            (HIGH_RISK_PROBABILITY, '#dc3545')):
+        parts.append(f'<line x1="{x_at(fraction):.1f}" '
+                     f'y1="{SCREENING_CHART_TOP}" x2="{x_at(fraction):.1f}" '
+                     f'y2="{bottom}" stroke="{color}" stroke-width="1" '
+                     'stroke-dasharray="5,3"/>')
+    parts.append(f'<path d="M{SCREENING_CHART_LEFT},{SCREENING_CHART_TOP} '
+                 f'V{bottom} H{SCREENING_CHART_RIGHT}" fill="none" '
+                 'stroke="black" stroke-width="0.8"/>')
+    for fraction in (0, MEDIUM_RISK_PROBABILITY, HIGH_RISK_PROBABILITY, 1):
+        parts.append(f'<text x="{x_at(fraction):.1f}" y="{bottom + 18}" '
+                     f'text-anchor="middle">{fraction * 100:.0f}%</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def new_report_document():
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_left_margin(15)
+    pdf.set_right_margin(15)
+    return pdf
+
+
+def report_document_bytes(pdf):
+    # PyFPDF returns the document as a latin-1 str, fpdf2 as a bytearray.
+    body = pdf.output(dest='S')
+    if isinstance(body, str):
+        body = body.encode('latin-1')
+    return bytes(body)
+
+
+def generate_pdf_report(patient_data, disease, prediction, probability,
+                        recommendations):
+    pdf = new_report_document()
+    write_report_section(pdf, patient_data, disease, prediction, probability,
+                         recommendations)
+    return report_document_bytes(pdf)
+
+
+def generate_merged_report(predictions):
+    # One document with a section (starting on a new page) per prediction.
+    pdf = new_report_document()
+    for data in predictions:
+        write_report_section(pdf, data['patient_data'], data['disease'],
+                             data['prediction'], data['probability'],
+                             data['recommendations'])
+    return report_document_bytes(pdf)
+
+
+def write_report_section(pdf, patient_data, disease, prediction, probability,
+                         recommendations):
+    pdf.add_page()
+
+    pdf.set_font('Arial', 'B', 20)
+    pdf.set_text_color(0, 102, 204)
+    pdf.cell(0, 15, 'Medical Prediction Report', 0, 1, 'C')
+    pdf.ln(5)
+
+    pdf.set_font('Arial', '', 10)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(
+        0, 5,
+        f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}', 0,
+        1, 'C')
+    pdf.ln(5)
+
+    pdf.set_draw_color(0, 102, 204)
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(8)
+
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 8, 'Patient Information', 0, 1)
+    pdf.ln(2)
+
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(60, 7, f"Name:", 0, 0)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.cell(0, 7, patient_data.get('name', 'N/A'), 0, 1)
+
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(60, 7, f"Age:", 0, 0)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.cell(0, 7, patient_data.get('age', 'N/A'), 0, 1)
+
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(60, 7, f"Gender:", 0, 0)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.cell(0, 7, patient_data.get('gender', 'N/A'), 0, 1)
+    pdf.ln(5)
+
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 8, f'Prediction Results: {disease.upper()}', 0, 1)
+    pdf.ln(2)
+
+    risk_level, _ = determine_risk_level(probability)
+
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(60, 7, "Prediction:", 0, 0)
+    pdf.set_font('Arial', 'B', 11)
+    if prediction == 1:
+        pdf.set_text_color(220, 53, 69)
+        pdf.cell(0, 7, "POSITIVE - At Risk", 0, 1)
+    else:
+        pdf.set_text_color(40, 167, 69)
+        pdf.cell(0, 7, "NEGATIVE - Low Risk", 0, 1)
+
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(60, 7, "Risk Probability:", 0, 0)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.cell(0, 7, f"{probability*100:.1f}%", 0, 1)
+
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(60, 7, "Risk Level:", 0, 0)
+    pdf.set_font('Arial', 'B', 11)
+    if risk_level == 'high':
+        pdf.set_text_color(220, 53, 69)
+    elif risk_level == 'medium':
+        pdf.set_text_color(255, 193, 7)
+    else:
+        pdf.set_text_color(40, 167, 69)
+    pdf.cell(0, 7, risk_level.upper(), 0, 1)
+    pdf.ln(5)
+
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font('Arial', 'B', 14)
+    pdf.cell(0, 8, 'Personalized Recommendations', 0, 1)
+    pdf.ln(2)
+
+    if 'lifestyle' in recommendations:
+        pdf.set_font('Arial', 'B', 11)
+        pdf.set_fill_color(230, 240, 255)
+        pdf.cell(0, 7, 'Lifestyle Modifications', 0, 1, 'L', True)
+        pdf.set_font('Arial', '', 9)
+        for i, rec in enumerate(recommendations['lifestyle'], 1):
+            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
+        pdf.ln(2)
+
+    if 'diet' in recommendations:
+        pdf.set_font('Arial', 'B', 11)
+        pdf.set_fill_color(255, 240, 230)
+        pdf.cell(0, 7, 'Dietary Recommendations', 0, 1, 'L', True)
+        pdf.set_font('Arial', '', 9)
+        for i, rec in enumerate(recommendations['diet'], 1):
+            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
+        pdf.ln(2)
+
+    if 'medical' in recommendations:
+        pdf.set_font('Arial', 'B', 11)
+        pdf.set_fill_color(255, 230, 230)
+        pdf.cell(0, 7, 'Medical Advice', 0, 1, 'L', True)
+        pdf.set_font('Arial', '', 9)
+        for i, rec in enumerate(recommendations['medical'], 1):
+            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
+        pdf.ln(2)
+
+    if 'prevention' in recommendations:
+        pdf.set_font('Arial', 'B', 11)
+        pdf.set_fill_color(230, 255, 230)
+        pdf.cell(0, 7, 'Prevention Strategies', 0, 1, 'L', True)
+        pdf.set_font('Arial', '', 9)
+        for i, rec in enumerate(recommendations['prevention'], 1):
+            pdf.multi_cell(0, 4, f"{i}. {rec}", align='L')
+        pdf.ln(2)
+
+    pdf.ln(5)
+    pdf.set_font('Arial', 'I', 9)
+    pdf.set_text_color(150, 150, 150)
+    pdf.multi_cell(
+        0, 5,
+        'Disclaimer: This report is generated by an AI-based prediction system and should not replace professional medical advice. Please consult with a qualified healthcare provider for proper diagnosis and treatment.'
+    )
+
+
+def report_digest(data):
+    # Content address of the report for a stored prediction: the SHA-256 of
+    # the fields the PDF is rendered from, serialized canonically so the same
+    # prediction always maps to the same digest.
+    payload = {
+        field: data[field]
+        for field in ('patient_data', 'disease', 'prediction', 'probability',
+                      'recommendations')
+    }
+    canonical = json.dumps(payload,
+                           sort_keys=True,
+                           separators=(',', ':'),
+                           ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def archive_report(body, disease):
+    # Keep a copy of a generated report when REPORT_ARCHIVE_DIR is set. The
+    # random suffix keeps reports generated in the same second apart, and the
+    # rename means a reader never sees a half-written file.
+    if not REPORT_ARCHIVE_DIR:
+        return None
+    os.makedirs(REPORT_ARCHIVE_DIR, exist_ok=True)
+    name = (f'{disease}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}_'
+            f'{secrets.token_hex(4)}.pdf')
+    path = os.path.join(REPORT_ARCHIVE_DIR, name)
+    with open(path + '.partial', 'wb') as f:
+        f.write(body)
+    os.replace(path + '.partial', path)
+    return path
+
+
+def store_report(digest, disease, body):
+    # Cache and archive a freshly rendered report, whether it was rendered
+    # here or in the bulk export pool.
+    REPORT_CACHE.set(digest, body)
+    archive_report(body, disease)
+
+
+def render_report(data, digest=None):
+    # The PDF for a stored prediction, rendered and cached on a miss.
+    digest = digest or report_digest(data)
+    body = REPORT_CACHE.get(digest)
+    if body is None:
+        body = generate_pdf_report(data['patient_data'], data['disease'],
+                                   data['prediction'], data['probability'],
+                                   data['recommendations'])
+        store_report(digest, data['disease'], body)
+    return body
+
+
+def report_payload(record):
+    # Normalize a prediction posted to the reports API into the same shape
+    # the form flow stores in the session.
+    disease = record.get('disease')
+    if disease not in FEATURE_COLUMNS:
+        raise ValueError(f'Unknown disease: {disease}')
+    if 'probability' not in record:
+        raise ValueError('missing "probability"')
+    probability = float(record['probability'])
+    if not 0.0 <= probability <= 1.0:
+        raise ValueError('probability must be between 0 and 1')
+    prediction = int(record.get('prediction', probability >= 0.5))
+    risk_level, _ = determine_risk_level(probability)
+    patient = record.get('patient') or {}
+    if not isinstance(patient, dict):
+        raise ValueError('"patient" must be an object')
+    return {
+        'patient_data': {
+            field: str(patient.get(field, 'N/A'))
+            for field in ('name', 'age', 'gender')
+        },
+        'disease': disease,
+        'prediction': prediction,
+        'probability': probability,
+        'risk_level': risk_level,
+        'recommendations': get_recommendations(disease, risk_level,
+                                               probability, {})
+    }
+
+
+class ReportJob:
+    """A queued PDF report, identified by the digest of its prediction."""
+
+    def __init__(self, digest, data, future):
+        self.id = digest
+        self.data = data
+        self.future = future
+        self.created = datetime.now()
+
+    @property
+    def status(self):
+        if self.future.cancelled():
+            # A download gave up waiting and rendered the report itself, so
+            # it is served from the cache (or rendered again) on request.
+            return 'ready'
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.exception() is not None else 'ready'
+
+    def to_dict(self):
+        job = {
+            'id': self.id,
+            'status': self.status,
+            'disease': self.data['disease'],
+            'created': self.created.isoformat(timespec='seconds'),
+            'status_url': url_for('report_status_api', job_id=self.id),
+            'download_url': url_for('report_download_api', job_id=self.id)
+        }
+        if job['status'] == 'failed':
+            job['error'] = str(self.future.exception())
+        return job
+
+
+class ReportQueue:
+    """Renders PDF reports on a thread pool off the request thread.
+
+    Jobs are keyed by report digest, so submitting a prediction that is
+    already queued or rendered returns the existing job. Finished jobs only
+    hold the prediction; the PDF itself lives in REPORT_CACHE and is
+    re-rendered on demand if it has been evicted.
+    """
+
+    def __init__(self, workers, limit, ttl):
+        self.workers = workers
+        self.jobs = LRUCache(limit, ttl)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Started lazily per process, like the batch workers, so a preloaded
+        # gunicorn master never forks children with a pool of dead threads.
+        if self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='report')
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, data):
+        digest = report_digest(data)
+        job = self.jobs.get(digest)
+        if job is None or job.status == 'failed':
+            future = self._get_executor().submit(self._render, data, digest)
+            job = ReportJob(digest, data, future)
+            self.jobs.set(digest, job)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def wait(self, digest, timeout):
+        # Let a download join an in-flight job instead of rendering the same
+        # report a second time. A job still queued when the wait runs out is
+        # cancelled, and the caller renders the report itself.
+        job = self.jobs.get(digest)
+        if job is not None:
+            done, _ = wait([job.future], timeout=timeout)
+            if not done:
+                job.future.cancel()
+
+    @staticmethod
+    def _render(data, digest):
+        render_report(data, digest)
+
+
+REPORT_QUEUE = ReportQueue(REPORT_WORKERS, REPORT_JOB_LIMIT,
+                           app.config['PERMANENT_SESSION_LIFETIME'])
+
+
+def report_response(data, digest):
+    if digest in request.if_none_match:
+        response = Response(status=304)
+    else:
+        REPORT_QUEUE.wait(digest, REPORT_WAIT_TIMEOUT)
+        response = send_file(
+            io.BytesIO(render_report(data, digest)),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f"{data['disease']}_prediction_report.pdf")
+    # The report is patient data: browsers may keep it but must revalidate,
+    # and shared caches must not store it.
+    response.set_etag(digest)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+REPORT_POOLS = {}
+REPORT_POOL_LOCK = threading.Lock()
+
+
+def get_report_pool():
+    # Bulk exports render across a small process pool owned by the current
+    # process. Its workers are spawned rather than forked, since forking a
+    # threaded gunicorn worker can copy locks that other threads hold; a
+    # spawned child imports the app without calling create_app(), so it
+    # costs an interpreter and fpdf rather than another copy of the app.
+    pid = os.getpid()
+    pool = REPORT_POOLS.get(pid)
+    if pool is None:
+        import multiprocessing
+
+        with REPORT_POOL_LOCK:
+            pool = REPORT_POOLS.get(pid)
+            if pool is None:
+                pool = REPORT_POOLS[pid] = ProcessPoolExecutor(
+                    max_workers=REPORT_PROCESSES,
+                    mp_context=multiprocessing.get_context('spawn'))
+    return pool
+
+
+class ZipStream:
+    """Write-only sink for streaming a zipfile.ZipFile.
+
+    Without tell() or seek(), zipfile writes each member with a trailing
+    data descriptor, so the archive can be sent as it is built.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_report_zip(predictions):
+    # Reports already in REPORT_CACHE are reused; the rest render across
+    # the pool and are added to the archive in request order as they
+    # finish. Capping the in-flight reports keeps memory bounded for
+    # cohorts of any size. A report that does not render within
+    # REPORT_BULK_TIMEOUT aborts the download instead of hanging it.
+    pool = get_report_pool()
+    sink = ZipStream()
+    pending = deque()
+
+    def write_next(archive):
+        name, digest, disease, body = pending.popleft()
+        if isinstance(body, Future):
+            body = body.result(timeout=REPORT_BULK_TIMEOUT)
+            store_report(digest, disease, body)
+        archive.writestr(name, body)
+
+    try:
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+            for index, data in enumerate(predictions, 1):
+                name = f"{index:04d}_{data['disease']}_report.pdf"
+                digest = report_digest(data)
+                body = REPORT_CACHE.get(digest)
+                if body is None:
+                    body = pool.submit(generate_pdf_report,
+                                       data['patient_data'], data['disease'],
+                                       data['prediction'], data['probability'],
+                                       data['recommendations'])
+                pending.append((name, digest, data['disease'], body))
+                if len(pending) >= REPORT_PROCESSES * 2:
+                    write_next(archive)
+                    yield sink.drain()
+            while pending:
+                write_next(archive)
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        # The client may disconnect mid-download.
+        for *_, body in pending:
+            if isinstance(body, Future):
+                body.cancel()
+
+
+BASE_TEMPLATE = '''
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{% block title %}{% endblock %}</title>
+    <link rel="stylesheet" href="{{ asset_url('vendor/bootstrap-5.3.0/css/bootstrap.min.css') }}">
+    <link rel="stylesheet" href="{{ asset_url('vendor/fontawesome-6.4.0/css/fontawesome.min.css') }}">
+    <link rel="stylesheet" href="{{ asset_url('vendor/fontawesome-6.4.0/css/solid.min.css') }}">
+    <link rel="stylesheet" href="{{ asset_url('css/app.css') }}">
+</head>
+<body class="{% block body_class %}{% endblock %}">
+{% block content %}{% endblock %}
+</body>
+</html>
+'''
+
+HOME_TEMPLATE = '''
+{% extends 'base.html' %}
+{% block title %}AI Disease Prediction System{% endblock %}
+{% block body_class %}page-home{% endblock %}
+{% block content %}
+    <div class="main-container">
+        <div class="header">
+            <h1><i class="fas fa-heartbeat"></i> AI-Powered Disease Prediction System</h1>
+            <p>Advanced Machine Learning for Early Disease Detection and Prevention</p>
+        </div>
+        
+        <div class="row mb-4">
+            <div class="col-md-3">
+                <div class="stats-card">
+                    <h4>5</h4>
+                    <p>Disease Models</p>
+                </div>
+            </div>
+            <div class="col-md-3">
+                <div class="stats-card">
+                    <h4>95%</h4>
+                    <p>Accuracy Rate</p>
+                </div>
+            </div>
+            <div class="col-md-3">
+                <div class="stats-card">
+                    <h4>24/7</h4>
+                    <p>Available</p>
+                </div>
+            </div>
+            <div class="col-md-3">
+                <div class="stats-card">
+                    <h4>100+</h4>
+                    <p>Recommendations</p>
+                </div>
+            </div>
+        </div>
+        
+        <div class="row">
+            <div class="col-md-6">
+                <div class="disease-card diabetes" onclick="window.location.href='/predict/diabetes'">
+                    <div class="icon"><i class="fas fa-pills"></i></div>
+                    <h3>Diabetes Risk Assessment</h3>
+                    <p>Predict Type 2 Diabetes risk based on glucose levels, BMI, insulin, and other factors.</p>
+                    <div class="mt-3">
+                        <span class="feature-badge"><i class="fas fa-check"></i> Glucose Analysis</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> BMI Evaluation</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Family History</span>
+                    </div>
+                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+                </div>
+            </div>
+            
+            <div class="col-md-6">
+                <div class="disease-card heart" onclick="window.location.href='/predict/heart'">
+                    <div class="icon"><i class="fas fa-heart"></i></div>
+                    <h3>Heart Disease Prediction</h3>
+                    <p>Evaluate cardiovascular risk using chest pain, cholesterol, blood pressure, and ECG data.</p>
+                    <div class="mt-3">
+                        <span class="feature-badge"><i class="fas fa-check"></i> BP Monitoring</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Cholesterol Check</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> ECG Analysis</span>
+                    </div>
+                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+                </div>
+            </div>
+            
+            <div class="col-md-6">
+                <div class="disease-card liver" onclick="window.location.href='/predict/liver'">
+                    <div class="icon"><i class="fas fa-user-md"></i></div>
+                    <h3>Liver Disease Detection</h3>
+                    <p>Assess liver health through enzyme levels, bilirubin, albumin, and protein ratios.</p>
+                    <div class="mt-3">
+                        <span class="feature-badge"><i class="fas fa-check"></i> Enzyme Levels</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Bilirubin Test</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Protein Analysis</span>
+                    </div>
+                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+                </div>
+            </div>
+            
+            <div class="col-md-6">
+                <div class="disease-card kidney" onclick="window.location.href='/predict/kidney'">
+                    <div class="icon"><i class="fas fa-kidney"></i></div>
+                    <h3>Kidney Disease Screening</h3>
+                    <p>Evaluate kidney function using creatinine, urea, electrolytes, and other biomarkers.</p>
+                    <div class="mt-3">
+                        <span class="feature-badge"><i class="fas fa-check"></i> Creatinine Test</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> eGFR Calculation</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Electrolyte Balance</span>
+                    </div>
+                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+                </div>
+            </div>
+            
+            <div class="col-md-12">
+                <div class="disease-card stroke" onclick="window.location.href='/predict/stroke'">
+                    <div class="icon"><i class="fas fa-brain"></i></div>
+                    <h3>Stroke Risk Prediction</h3>
+                    <p>Assess stroke risk based on age, hypertension, heart disease, glucose levels, and lifestyle factors.</p>
+                    <div class="mt-3">
+                        <span class="feature-badge"><i class="fas fa-check"></i> Hypertension Check</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Heart Disease Link</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Lifestyle Analysis</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Age Factor</span>
+                    </div>
+                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+                </div>
+            </div>
+            
+            <div class="col-md-12">
+                <div class="disease-card screening" onclick="window.location.href='/screening'">
+                    <div class="icon"><i class="fas fa-notes-medical"></i></div>
+                    <h3>Full Health Screening</h3>
+                    <p>Fill out one combined form and get risk estimates for all five diseases in a single consolidated report.</p>
+                    <div class="mt-3">
+                        <span class="feature-badge"><i class="fas fa-check"></i> All 5 Models</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> One Form</span>
+                        <span class="feature-badge"><i class="fas fa-check"></i> Combined Chart</span>
+                    </div>
+                    <button class="btn btn-predict mt-3">Start Screening <i class="fas fa-arrow-right"></i></button>
+                </div>
+            </div>
+        </div>
+        
+        <div class="info-section">
+            <h4><i class="fas fa-info-circle"></i> How It Works</h4>
+            <div class="row mt-3">
+                <div class="col-md-3 text-center">
+                    <div class="mb-2"><i class="fas fa-clipboard-list fa-3x text-primary"></i></div>
+                    <h6>1. Enter Data</h6>
+                    <p class="small">Provide your health parameters</p>
+                </div>
+                <div class="col-md-3 text-center">
+                    <div class="mb-2"><i class="fas fa-robot fa-3x text-success"></i></div>
+                    <h6>2. AI Analysis</h6>
+                    <p class="small">ML models analyze your data</p>
+                </div>
+                <div class="col-md-3 text-center">
+                    <div class="mb-2"><i class="fas fa-chart-line fa-3x text-warning"></i></div>
+                    <h6>3. Get Results</h6>
+                    <p class="small">Receive detailed predictions</p>
+                </div>
+                <div class="col-md-3 text-center">
+                    <div class="mb-2"><i class="fas fa-file-download fa-3x text-danger"></i></div>
+                    <h6>4. Download Report</h6>
+                    <p class="small">PDF with recommendations</p>
+                </div>
+            </div>
+        </div>
+        
+        <div class="info-section mt-3">
+            <h4><i class="fas fa-shield-alt"></i> Key Features</h4>
+            <ul class="mt-3">
+                <li><strong>Multi-Disease Predictions:</strong> Comprehensive analysis for 5 major diseases</li>
+                <li><strong>Personalized Recommendations:</strong> Tailored lifestyle, diet, and medical advice</li>
+                <li><strong>PDF Reports:</strong> Downloadable detailed reports with charts and recommendations</li>
+                <li><strong>CSV Export:</strong> Export your data for record-keeping</li>
+                <li><strong>Risk Visualization:</strong> Interactive gauge charts and probability indicators</li>
+                <li><strong>Evidence-Based:</strong> Recommendations based on medical guidelines</li>
+            </ul>
+            <p class="mt-3 text-muted small"><i class="fas fa-exclamation-triangle"></i> <strong>Disclaimer:</strong> This tool is for educational purposes only and should not replace professional medical advice. Always consult with qualified healthcare providers for diagnosis and treatment.</p>
+        </div>
+        
+        <div class="text-center mt-4 mb-4">
+            <a href="/download/source" class="btn btn-lg" style="background: linear-gradient(135deg, #667eea, #764ba2); color: white; border-radius: 30px; padding: 15px 40px; font-weight: bold; text-decoration: none; box-shadow: 0 5px 15px rgba(0,0,0,0.2);">
+                <i class="fas fa-download"></i> Download Source Code (app.py)
+            </a>
+            <p class="mt-2 text-white small">Complete Flask application in a single Python file</p>
+        </div>
+    </div>
+{% endblock %}
+'''
+
+DIABETES_FORM = '''
+{% extends 'base.html' %}
+{% block title %}Diabetes Risk Assessment{% endblock %}
+{% block body_class %}page-form theme-diabetes{% endblock %}
+{% block content %}
+    <div class="form-container">
+        <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
+        <h2><i class="fas fa-pills"></i> Diabetes Risk Assessment</h2>
+        <div class="info-box">
+            <strong><i class="fas fa-info-circle"></i> Information:</strong> Please provide accurate information for better prediction results.
+        </div>
+        <form action="/predict/diabetes" method="POST">
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Full Name *</label>
+                    <input type="text" name="name" class="form-control" required>
+                </div>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Age *</label>
+                    <input type="number" name="age" class="form-control" min="1" max="120" required>
+                </div>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Gender *</label>
+                    <select name="gender" class="form-control" required>
+                        <option value="">Select</option>
+                        <option value="Male">Male</option>
+                        <option value="Female">Female</option>
+                        <option value="Other">Other</option>
+                    </select>
+                </div>
+            </div>
+            
+            <h5 class="mt-4 mb-3">Medical Parameters</h5>
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Glucose Level (mg/dL) *</label>
+                    <input type="number" step="0.01" name="glucose" class="form-control" placeholder="e.g., 120" required>
+                    <small class="text-muted">Fasting: 70-100 mg/dL (normal)</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Blood Pressure (mmHg) *</label>
+                    <input type="number" step="0.01" name="blood_pressure" class="form-control" placeholder="e.g., 80" required>
+                    <small class="text-muted">Normal: 80-120 mmHg</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Skin Thickness (mm)</label>
+                    <input type="number" step="0.01" name="skin_thickness" class="form-control" placeholder="e.g., 20">
+                    <small class="text-muted">Triceps skinfold</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Insulin Level (μU/mL)</label>
+                    <input type="number" step="0.01" name="insulin" class="form-control" placeholder="e.g., 80">
+                    <small class="text-muted">Normal: 16-166 μU/mL</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">BMI (Body Mass Index) *</label>
+                    <input type="number" step="0.01" name="bmi" class="form-control" placeholder="e.g., 25.5" required>
+                    <small class="text-muted">Normal: 18.5-24.9</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Diabetes Pedigree Function</label>
+                    <input type="number" step="0.001" name="dpf" class="form-control" placeholder="e.g., 0.5">
+                    <small class="text-muted">Family history factor</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Number of Pregnancies</label>
+                    <input type="number" name="pregnancies" class="form-control" placeholder="e.g., 0" value="0">
+                    <small class="text-muted">For females only</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Age (again for model)</label>
+                    <input type="number" name="age_model" class="form-control" placeholder="e.g., 35">
+                </div>
+            </div>
+            
+            <div class="mt-4 text-center">
+                <button type="submit" class="btn btn-submit">
+                    <i class="fas fa-chart-line"></i> Analyze Diabetes Risk
+                </button>
+            </div>
+        </form>
+    </div>
+{% endblock %}
+'''
+
+HEART_FORM = '''
+{% extends 'base.html' %}
+{% block title %}Heart Disease Prediction{% endblock %}
+{% block body_class %}page-form theme-heart{% endblock %}
+{% block content %}
+    <div class="form-container">
+        <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
+        <h2><i class="fas fa-heart"></i> Heart Disease Prediction</h2>
+        <div class="info-box">
+            <strong><i class="fas fa-info-circle"></i> Information:</strong> Cardiovascular assessment based on clinical parameters.
+        </div>
+        <form action="/predict/heart" method="POST">
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Full Name *</label>
+                    <input type="text" name="name" class="form-control" required>
+                </div>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Age *</label>
+                    <input type="number" name="age" class="form-control" min="1" max="120" required>
+                </div>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Gender *</label>
+                    <select name="gender" class="form-control" required>
+                        <option value="">Select</option>
+                        <option value="Male">Male</option>
+                        <option value="Female">Female</option>
+                        <option value="Other">Other</option>
+                    </select>
+                </div>
+            </div>
+            
+            <h5 class="mt-4 mb-3">Cardiovascular Parameters</h5>
+            <div class="row">
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Chest Pain Type *</label>
+                    <select name="cp" class="form-control" required>
+                        <option value="0">Typical Angina</option>
+                        <option value="1">Atypical Angina</option>
+                        <option value="2">Non-anginal Pain</option>
+                        <option value="3">Asymptomatic</option>
+                    </select>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Resting BP (mmHg) *</label>
+                    <input type="number" name="trestbps" class="form-control" placeholder="e.g., 120" required>
+                    <small class="text-muted">Normal: 90-120</small>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Cholesterol (mg/dL) *</label>
+                    <input type="number" name="chol" class="form-control" placeholder="e.g., 200" required>
+                    <small class="text-muted">Normal: <200</small>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Fasting Blood Sugar *</label>
+                    <select name="fbs" class="form-control" required>
+                        <option value="0">&lt; 120 mg/dL</option>
+                        <option value="1">&gt; 120 mg/dL</option>
+                    </select>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Resting ECG *</label>
+                    <select name="restecg" class="form-control" required>
+                        <option value="0">Normal</option>
+                        <option value="1">ST-T Abnormality</option>
+                        <option value="2">LV Hypertrophy</option>
+                    </select>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Max Heart Rate *</label>
+                    <input type="number" name="thalach" class="form-control" placeholder="e.g., 150" required>
+                    <small class="text-muted">Achieved during exercise</small>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Exercise Induced Angina *</label>
+                    <select name="exang" class="form-control" required>
+                        <option value="0">No</option>
+                        <option value="1">Yes</option>
+                    </select>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">ST Depression *</label>
+                    <input type="number" step="0.1" name="oldpeak" class="form-control" placeholder="e.g., 1.0" required>
+                    <small class="text-muted">Induced by exercise</small>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Slope of ST *</label>
+                    <select name="slope" class="form-control" required>
+                        <option value="0">Upsloping</option>
+                        <option value="1">Flat</option>
+                        <option value="2">Downsloping</option>
+                    </select>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Major Vessels *</label>
+                    <input type="number" name="ca" class="form-control" min="0" max="4" placeholder="0-4" required>
+                    <small class="text-muted">Colored by fluoroscopy</small>
+                </div>
+                <div class="col-md-4 mb-3">
+                    <label class="form-label">Thalassemia *</label>
+                    <select name="thal" class="form-control" required>
+                        <option value="0">Normal</option>
+                        <option value="1">Fixed Defect</option>
+                        <option value="2">Reversible Defect</option>
+                    </select>
                 </div>
             </div>
-            <div class="col-md-3">
-                <div class="stats-card">
-                    <h4>95%</h4>
-                    <p>Accuracy Rate</p>
-                </div>
+            
+            <div class="mt-4 text-center">
+                <button type="submit" class="btn btn-submit">
+                    <i class="fas fa-heartbeat"></i> Analyze Heart Health
+                </button>
             </div>
-            <div class="col-md-3">
-                <div class="stats-card">
-                    <h4>24/7</h4>
-                    <p>Available</p>
+        </form>
+    </div>
+{% endblock %}
+'''
+
+LIVER_FORM = '''
+{% extends 'base.html' %}
+{% block title %}Liver Disease Detection{% endblock %}
+{% block body_class %}page-form theme-liver{% endblock %}
+{% block content %}
+    <div class="form-container">
+        <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
+        <h2><i class="fas fa-user-md"></i> Liver Disease Detection</h2>
+        <div class="info-box">
+            <strong><i class="fas fa-info-circle"></i> Information:</strong> Liver function assessment based on enzymatic tests.
+        </div>
+        <form action="/predict/liver" method="POST">
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Full Name *</label>
+                    <input type="text" name="name" class="form-control" required>
                 </div>
-            </div>
-            <div class="col-md-3">
-                <div class="stats-card">
-                    <h4>100+</h4>
-                    <p>Recommendations</p>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Age *</label>
+                    <input type="number" name="age" class="form-control" min="1" max="120" required>
                 </div>
-            </div>
-        </div>
-        
-        <div class="row">
-            <div class="col-md-6">
-                <div class="disease-card diabetes" onclick="window.location.href='/predict/diabetes'">
-                    <div class="icon"><i class="fas fa-pills"></i></div>
-                    <h3>Diabetes Risk Assessment</h3>
-                    <p>Predict Type 2 Diabetes risk based on glucose levels, BMI, insulin, and other factors.</p>
-                    <div class="mt-3">
-                        <span class="feature-badge"><i class="fas fa-check"></i> Glucose Analysis</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> BMI Evaluation</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Family History</span>
-                    </div>
-                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Gender *</label>
+                    <select name="gender" class="form-control" required>
+                        <option value="">Select</option>
+                        <option value="Male">Male</option>
+                        <option value="Female">Female</option>
+                        <option value="Other">Other</option>
+                    </select>
                 </div>
             </div>
             
-            <div class="col-md-6">
-                <div class="disease-card heart" onclick="window.location.href='/predict/heart'">
-                    <div class="icon"><i class="fas fa-heart"></i></div>
-                    <h3>Heart Disease Prediction</h3>
-                    <p>Evaluate cardiovascular risk using chest pain, cholesterol, blood pressure, and ECG data.</p>
-                    <div class="mt-3">
-                        <span class="feature-badge"><i class="fas fa-check"></i> BP Monitoring</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Cholesterol Check</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> ECG Analysis</span>
-                    </div>
-                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+            <h5 class="mt-4 mb-3">Liver Function Tests</h5>
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Total Bilirubin (mg/dL) *</label>
+                    <input type="number" step="0.01" name="total_bilirubin" class="form-control" placeholder="e.g., 0.8" required>
+                    <small class="text-muted">Normal: 0.1-1.2 mg/dL</small>
                 </div>
-            </div>
-            
-            <div class="col-md-6">
-                <div class="disease-card liver" onclick="window.location.href='/predict/liver'">
-                    <div class="icon"><i class="fas fa-user-md"></i></div>
-                    <h3>Liver Disease Detection</h3>
-                    <p>Assess liver health through enzyme levels, bilirubin, albumin, and protein ratios.</p>
-                    <div class="mt-3">
-                        <span class="feature-badge"><i class="fas fa-check"></i> Enzyme Levels</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Bilirubin Test</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Protein Analysis</span>
-                    </div>
-                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Direct Bilirubin (mg/dL) *</label>
+                    <input type="number" step="0.01" name="direct_bilirubin" class="form-control" placeholder="e.g., 0.3" required>
+                    <small class="text-muted">Normal: 0.0-0.3 mg/dL</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Alkaline Phosphatase (IU/L) *</label>
+                    <input type="number" name="alkaline_phosphotase" class="form-control" placeholder="e.g., 200" required>
+                    <small class="text-muted">Normal: 44-147 IU/L</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Alamine Aminotransferase (IU/L) *</label>
+                    <input type="number" name="alamine_aminotransferase" class="form-control" placeholder="e.g., 30" required>
+                    <small class="text-muted">Normal: 7-56 IU/L</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Aspartate Aminotransferase (IU/L) *</label>
+                    <input type="number" name="aspartate_aminotransferase" class="form-control" placeholder="e.g., 35" required>
+                    <small class="text-muted">Normal: 10-40 IU/L</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Total Proteins (g/dL) *</label>
+                    <input type="number" step="0.01" name="total_proteins" class="form-control" placeholder="e.g., 7.0" required>
+                    <small class="text-muted">Normal: 6.0-8.3 g/dL</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Albumin (g/dL) *</label>
+                    <input type="number" step="0.01" name="albumin" class="form-control" placeholder="e.g., 4.0" required>
+                    <small class="text-muted">Normal: 3.5-5.5 g/dL</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Albumin/Globulin Ratio *</label>
+                    <input type="number" step="0.01" name="ag_ratio" class="form-control" placeholder="e.g., 1.2" required>
+                    <small class="text-muted">Normal: 1.0-2.5</small>
                 </div>
             </div>
             
-            <div class="col-md-6">
-                <div class="disease-card kidney" onclick="window.location.href='/predict/kidney'">
-                    <div class="icon"><i class="fas fa-kidney"></i></div>
-                    <h3>Kidney Disease Screening</h3>
-                    <p>Evaluate kidney function using creatinine, urea, electrolytes, and other biomarkers.</p>
-                    <div class="mt-3">
-                        <span class="feature-badge"><i class="fas fa-check"></i> Creatinine Test</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> eGFR Calculation</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Electrolyte Balance</span>
-                    </div>
-                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+            <div class="mt-4 text-center">
+                <button type="submit" class="btn btn-submit">
+                    <i class="fas fa-flask"></i> Analyze Liver Function
+                </button>
+            </div>
+        </form>
+    </div>
+{% endblock %}
+'''
+
+KIDNEY_FORM = '''
+{% extends 'base.html' %}
+{% block title %}Kidney Disease Screening{% endblock %}
+{% block body_class %}page-form theme-kidney{% endblock %}
+{% block content %}
+    <div class="form-container">
+        <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
+        <h2><i class="fas fa-kidney"></i> Kidney Disease Screening</h2>
+        <div class="info-box">
+            <strong><i class="fas fa-info-circle"></i> Information:</strong> Kidney function assessment based on blood and urine tests.
+        </div>
+        <form action="/predict/kidney" method="POST">
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Full Name *</label>
+                    <input type="text" name="name" class="form-control" required>
+                </div>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Age *</label>
+                    <input type="number" name="age" class="form-control" min="1" max="120" required>
+                </div>
+                <div class="col-md-3 mb-3">
+                    <label class="form-label">Gender *</label>
+                    <select name="gender" class="form-control" required>
+                        <option value="">Select</option>
+                        <option value="Male">Male</option>
+                        <option value="Female">Female</option>
+                        <option value="Other">Other</option>
+                    </select>
                 </div>
             </div>
             
-            <div class="col-md-12">
-                <div class="disease-card stroke" onclick="window.location.href='/predict/stroke'">
-                    <div class="icon"><i class="fas fa-brain"></i></div>
-                    <h3>Stroke Risk Prediction</h3>
-                    <p>Assess stroke risk based on age, hypertension, heart disease, glucose levels, and lifestyle factors.</p>
-                    <div class="mt-3">
-                        <span class="feature-badge"><i class="fas fa-check"></i> Hypertension Check</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Heart Disease Link</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Lifestyle Analysis</span>
-                        <span class="feature-badge"><i class="fas fa-check"></i> Age Factor</span>
-                    </div>
-                    <button class="btn btn-predict mt-3">Start Assessment <i class="fas fa-arrow-right"></i></button>
+            <h5 class="mt-4 mb-3">Kidney Function Tests</h5>
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Blood Pressure (mmHg) *</label>
+                    <input type="number" name="blood_pressure" class="form-control" placeholder="e.g., 80" required>
+                    <small class="text-muted">Diastolic BP</small>
                 </div>
-            </div>
-        </div>
-        
-        <div class="info-section">
-            <h4><i class="fas fa-info-circle"></i> How It Works</h4>
-            <div class="row mt-3">
-                <div class="col-md-3 text-center">
-                    <div class="mb-2"><i class="fas fa-clipboard-list fa-3x text-primary"></i></div>
-                    <h6>1. Enter Data</h6>
-                    <p class="small">Provide your health parameters</p>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Specific Gravity *</label>
+                    <input type="number" step="0.001" name="specific_gravity" class="form-control" placeholder="e.g., 1.020" required>
+                    <small class="text-muted">Urine specific gravity (1.003-1.030)</small>
                 </div>
-                <div class="col-md-3 text-center">
-                    <div class="mb-2"><i class="fas fa-robot fa-3x text-success"></i></div>
-                    <h6>2. AI Analysis</h6>
-                    <p class="small">ML models analyze your data</p>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Albumin Level *</label>
+                    <input type="number" name="albumin" class="form-control" placeholder="e.g., 0-5" required>
+                    <small class="text-muted">0=normal, 5=high</small>
                 </div>
-                <div class="col-md-3 text-center">
-                    <div class="mb-2"><i class="fas fa-chart-line fa-3x text-warning"></i></div>
-                    <h6>3. Get Results</h6>
-                    <p class="small">Receive detailed predictions</p>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Sugar Level *</label>
+                    <input type="number" name="sugar" class="form-control" placeholder="e.g., 0-5" required>
+                    <small class="text-muted">0=normal, 5=high</small>
                 </div>
-                <div class="col-md-3 text-center">
-                    <div class="mb-2"><i class="fas fa-file-download fa-3x text-danger"></i></div>
-                    <h6>4. Download Report</h6>
-                    <p class="small">PDF with recommendations</p>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Red Blood Cells *</label>
+                    <select name="red_blood_cells" class="form-control" required>
+                        <option value="0">Normal</option>
+                        <option value="1">Abnormal</option>
+                    </select>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Pus Cells *</label>
+                    <select name="pus_cell" class="form-control" required>
+                        <option value="0">Normal</option>
+                        <option value="1">Abnormal</option>
+                    </select>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Blood Urea (mg/dL) *</label>
+                    <input type="number" step="0.1" name="blood_urea" class="form-control" placeholder="e.g., 30" required>
+                    <small class="text-muted">Normal: 7-20 mg/dL</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Serum Creatinine (mg/dL) *</label>
+                    <input type="number" step="0.1" name="serum_creatinine" class="form-control" placeholder="e.g., 1.0" required>
+                    <small class="text-muted">Normal: 0.6-1.2 mg/dL</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Sodium (mEq/L) *</label>
+                    <input type="number" step="0.1" name="sodium" class="form-control" placeholder="e.g., 140" required>
+                    <small class="text-muted">Normal: 135-145 mEq/L</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Potassium (mEq/L) *</label>
+                    <input type="number" step="0.1" name="potassium" class="form-control" placeholder="e.g., 4.5" required>
+                    <small class="text-muted">Normal: 3.5-5.0 mEq/L</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Hemoglobin (g/dL) *</label>
+                    <input type="number" step="0.1" name="hemoglobin" class="form-control" placeholder="e.g., 14" required>
+                    <small class="text-muted">Normal: 12-18 g/dL</small>
                 </div>
             </div>
-        </div>
-        
-        <div class="info-section mt-3">
-            <h4><i class="fas fa-shield-alt"></i> Key Features</h4>
-            <ul class="mt-3">
-                <li><strong>Multi-Disease Predictions:</strong> Comprehensive analysis for 5 major diseases</li>
-                <li><strong>Personalized Recommendations:</strong> Tailored lifestyle, diet, and medical advice</li>
-                <li><strong>PDF Reports:</strong> Downloadable detailed reports with charts and recommendations</li>
-                <li><strong>CSV Export:</strong> Export your data for record-keeping</li>
-                <li><strong>Risk Visualization:</strong> Interactive gauge charts and probability indicators</li>
-                <li><strong>Evidence-Based:</strong> Recommendations based on medical guidelines</li>
-            </ul>
-            <p class="mt-3 text-muted small"><i class="fas fa-exclamation-triangle"></i> <strong>Disclaimer:</strong> This tool is for educational purposes only and should not replace professional medical advice. Always consult with qualified healthcare providers for diagnosis and treatment.</p>
-        </div>
-        
-        <div class="text-center mt-4 mb-4">
-            <a href="/download/source" class="btn btn-lg" style="background: linear-gradient(135deg, #667eea, #764ba2); color: white; border-radius: 30px; padding: 15px 40px; font-weight: bold; text-decoration: none; box-shadow: 0 5px 15px rgba(0,0,0,0.2);">
-                <i class="fas fa-download"></i> Download Source Code (app.py)
-            </a>
-            <p class="mt-2 text-white small">Complete Flask application in a single Python file</p>
-        </div>
+            
+            <div class="mt-4 text-center">
+                <button type="submit" class="btn btn-submit">
+                    <i class="fas fa-vial"></i> Analyze Kidney Function
+                </button>
+            </div>
+        </form>
     </div>
-    
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-</body>
-</html>
+{% endblock %}
 '''
 
-DIABETES_FORM = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Diabetes Risk Assessment</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        body {
-            background: linear-gradient(135deg, #e74c3c 0%, #c0392b 100%);
-            min-height: 100vh;
-            padding: 20px 0;
-        }
-        .form-container {
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }
-        h2 { color: #e74c3c; margin-bottom: 30px; }
-        .form-label { font-weight: 600; color: #333; }
-        .form-control:focus { border-color: #e74c3c; box-shadow: 0 0 0 0.2rem rgba(231, 76, 60, 0.25); }
-        .btn-submit {
-            background: linear-gradient(135deg, #e74c3c, #c0392b);
-            color: white;
-            border: none;
-            padding: 12px 40px;
-            border-radius: 25px;
-            font-weight: bold;
-        }
-        .btn-submit:hover { transform: scale(1.05); color: white; }
-        .info-box {
-            background: #fff3cd;
-            border-left: 4px solid #ffc107;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-    </style>
-</head>
-<body>
+STROKE_FORM = '''
+{% extends 'base.html' %}
+{% block title %}Stroke Risk Prediction{% endblock %}
+{% block body_class %}page-form theme-stroke{% endblock %}
+{% block content %}
     <div class="form-container">
         <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
-        <h2><i class="fas fa-pills"></i> Diabetes Risk Assessment</h2>
+        <h2><i class="fas fa-brain"></i> Stroke Risk Prediction</h2>
         <div class="info-box">
-            <strong><i class="fas fa-info-circle"></i> Information:</strong> Please provide accurate information for better prediction results.
+            <strong><i class="fas fa-info-circle"></i> Information:</strong> Assess stroke risk based on lifestyle and medical factors.
         </div>
-        <form action="/predict/diabetes" method="POST">
+        <form action="/predict/stroke" method="POST">
             <div class="row">
                 <div class="col-md-6 mb-3">
                     <label class="form-label">Full Name *</label>
@@ -1036,112 +3126,223 @@ DIABETES_FORM = '''
                 </div>
             </div>
             
-            <h5 class="mt-4 mb-3">Medical Parameters</h5>
+            <h5 class="mt-4 mb-3">Stroke Risk Factors</h5>
             <div class="row">
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Glucose Level (mg/dL) *</label>
-                    <input type="number" step="0.01" name="glucose" class="form-control" placeholder="e.g., 120" required>
-                    <small class="text-muted">Fasting: 70-100 mg/dL (normal)</small>
+                    <label class="form-label">Hypertension *</label>
+                    <select name="hypertension" class="form-control" required>
+                        <option value="0">No</option>
+                        <option value="1">Yes</option>
+                    </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Blood Pressure (mmHg) *</label>
-                    <input type="number" step="0.01" name="blood_pressure" class="form-control" placeholder="e.g., 80" required>
-                    <small class="text-muted">Normal: 80-120 mmHg</small>
+                    <label class="form-label">Heart Disease *</label>
+                    <select name="heart_disease" class="form-control" required>
+                        <option value="0">No</option>
+                        <option value="1">Yes</option>
+                    </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Skin Thickness (mm)</label>
-                    <input type="number" step="0.01" name="skin_thickness" class="form-control" placeholder="e.g., 20">
-                    <small class="text-muted">Triceps skinfold</small>
+                    <label class="form-label">Ever Married *</label>
+                    <select name="ever_married" class="form-control" required>
+                        <option value="0">No</option>
+                        <option value="1">Yes</option>
+                    </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Insulin Level (μU/mL)</label>
-                    <input type="number" step="0.01" name="insulin" class="form-control" placeholder="e.g., 80">
-                    <small class="text-muted">Normal: 16-166 μU/mL</small>
+                    <label class="form-label">Work Type *</label>
+                    <select name="work_type" class="form-control" required>
+                        <option value="0">Never Worked</option>
+                        <option value="1">Children</option>
+                        <option value="2">Government Job</option>
+                        <option value="3">Private Job</option>
+                        <option value="4">Self-employed</option>
+                    </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">BMI (Body Mass Index) *</label>
-                    <input type="number" step="0.01" name="bmi" class="form-control" placeholder="e.g., 25.5" required>
-                    <small class="text-muted">Normal: 18.5-24.9</small>
+                    <label class="form-label">Residence Type *</label>
+                    <select name="residence_type" class="form-control" required>
+                        <option value="0">Rural</option>
+                        <option value="1">Urban</option>
+                    </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Diabetes Pedigree Function</label>
-                    <input type="number" step="0.001" name="dpf" class="form-control" placeholder="e.g., 0.5">
-                    <small class="text-muted">Family history factor</small>
+                    <label class="form-label">Average Glucose Level (mg/dL) *</label>
+                    <input type="number" step="0.01" name="avg_glucose_level" class="form-control" placeholder="e.g., 100" required>
+                    <small class="text-muted">Normal: 70-100 mg/dL</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Number of Pregnancies</label>
-                    <input type="number" name="pregnancies" class="form-control" placeholder="e.g., 0" value="0">
-                    <small class="text-muted">For females only</small>
+                    <label class="form-label">BMI *</label>
+                    <input type="number" step="0.1" name="bmi" class="form-control" placeholder="e.g., 25.5" required>
+                    <small class="text-muted">Normal: 18.5-24.9</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Age (again for model)</label>
-                    <input type="number" name="age_model" class="form-control" placeholder="e.g., 35">
+                    <label class="form-label">Smoking Status *</label>
+                    <select name="smoking_status" class="form-control" required>
+                        <option value="0">Never Smoked</option>
+                        <option value="1">Formerly Smoked</option>
+                        <option value="2">Smokes</option>
+                        <option value="3">Unknown</option>
+                    </select>
                 </div>
             </div>
             
             <div class="mt-4 text-center">
                 <button type="submit" class="btn btn-submit">
-                    <i class="fas fa-chart-line"></i> Analyze Diabetes Risk
+                    <i class="fas fa-brain"></i> Analyze Stroke Risk
                 </button>
             </div>
         </form>
     </div>
-</body>
-</html>
+{% endblock %}
 '''
 
-HEART_FORM = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Heart Disease Prediction</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        body {
-            background: linear-gradient(135deg, #c0392b 0%, #8e44ad 100%);
-            min-height: 100vh;
-            padding: 20px 0;
-        }
-        .form-container {
-            max-width: 900px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }
-        h2 { color: #c0392b; margin-bottom: 30px; }
-        .form-label { font-weight: 600; color: #333; }
-        .form-control:focus { border-color: #c0392b; box-shadow: 0 0 0 0.2rem rgba(192, 57, 43, 0.25); }
-        .btn-submit {
-            background: linear-gradient(135deg, #c0392b, #8e44ad);
-            color: white;
-            border: none;
-            padding: 12px 40px;
-            border-radius: 25px;
-            font-weight: bold;
-        }
-        .btn-submit:hover { transform: scale(1.05); color: white; }
-        .info-box {
-            background: #fff3cd;
-            border-left: 4px solid #ffc107;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-    </style>
-</head>
-<body>
+RESULT_TEMPLATE = '''
+{% extends 'base.html' %}
+{% block title %}{{ disease.title() }} Prediction Results{% endblock %}
+{% block body_class %}page-results{% endblock %}
+{% block content %}
+    <div class="results-container">
+        <div class="card">
+            <div class="card-header">
+                <h3><i class="fas fa-file-medical"></i> {{ disease.title() }} Prediction Results</h3>
+            </div>
+            <div class="card-body">
+                <div class="patient-info">
+                    <div class="row">
+                        <div class="col-md-4">
+                            <strong>Name:</strong> {{ patient_data.name }}
+                        </div>
+                        <div class="col-md-4">
+                            <strong>Age:</strong> {{ patient_data.age }}
+                        </div>
+                        <div class="col-md-4">
+                            <strong>Gender:</strong> {{ patient_data.gender }}
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="prediction-result {% if prediction == 1 %}positive{% else %}negative{% endif %}">
+                    <h1>
+                        {% if prediction == 1 %}
+                        <i class="fas fa-exclamation-triangle"></i> POSITIVE
+                        {% else %}
+                        <i class="fas fa-check-circle"></i> NEGATIVE
+                        {% endif %}
+                    </h1>
+                    <h3>
+                        {% if prediction == 1 %}
+                        Risk Detected - Medical Consultation Recommended
+                        {% else %}
+                        Low Risk - Continue Healthy Lifestyle
+                        {% endif %}
+                    </h3>
+                    <h2 class="mt-3">Risk Probability: {{ "%.1f"|format(probability * 100) }}%</h2>
+                    <h4>Risk Level: <span class="badge bg-light text-dark">{{ risk_level.upper() }}</span></h4>
+                </div>
+            </div>
+        </div>
+        
+        <div class="card">
+            <div class="card-header">
+                <h4><i class="fas fa-tachometer-alt"></i> Risk Assessment Gauge</h4>
+            </div>
+            <div class="card-body gauge-container">
+                <img src="{{ gauge_url }}" alt="Risk Gauge" width="300" height="190">
+            </div>
+        </div>
+        
+        <div class="card">
+            <div class="card-header">
+                <h4><i class="fas fa-clipboard-list"></i> Personalized Recommendations</h4>
+            </div>
+            <div class="card-body recommendation-section">
+                {% if recommendations.lifestyle %}
+                <div class="recommendation-item lifestyle">
+                    <h5><i class="fas fa-running"></i> Lifestyle Modifications</h5>
+                    <ul>
+                        {% for rec in recommendations.lifestyle %}
+                        <li>{{ rec }}</li>
+                        {% endfor %}
+                    </ul>
+                </div>
+                {% endif %}
+                
+                {% if recommendations.diet %}
+                <div class="recommendation-item diet">
+                    <h5><i class="fas fa-utensils"></i> Dietary Recommendations</h5>
+                    <ul>
+                        {% for rec in recommendations.diet %}
+                        <li>{{ rec }}</li>
+                        {% endfor %}
+                    </ul>
+                </div>
+                {% endif %}
+                
+                {% if recommendations.medical %}
+                <div class="recommendation-item medical">
+                    <h5><i class="fas fa-stethoscope"></i> Medical Advice</h5>
+                    <ul>
+                        {% for rec in recommendations.medical %}
+                        <li>{{ rec }}</li>
+                        {% endfor %}
+                    </ul>
+                </div>
+                {% endif %}
+                
+                {% if recommendations.prevention %}
+                <div class="recommendation-item prevention">
+                    <h5><i class="fas fa-shield-alt"></i> Prevention Strategies</h5>
+                    <ul>
+                        {% for rec in recommendations.prevention %}
+                        <li>{{ rec }}</li>
+                        {% endfor %}
+                    </ul>
+                </div>
+                {% endif %}
+            </div>
+        </div>
+        
+        <div class="text-center mb-4">
+            <a href="/download/pdf?id={{ prediction_id }}" class="btn btn-download">
+                <i class="fas fa-file-pdf"></i> Download PDF Report
+            </a>
+            <a href="/download/csv?id={{ prediction_id }}" class="btn btn-download">
+                <i class="fas fa-file-csv"></i> Download CSV Data
+            </a>
+            <a href="/download/csv?history=1" class="btn btn-download">
+                <i class="fas fa-history"></i> Download History CSV
+            </a>
+            <a href="/" class="btn btn-download" style="background: linear-gradient(135deg, #007bff, #0056b3);">
+                <i class="fas fa-home"></i> Back to Home
+            </a>
+        </div>
+        
+        <div class="card">
+            <div class="card-body">
+                <p class="text-muted small text-center mb-0">
+                    <i class="fas fa-exclamation-triangle"></i> <strong>Disclaimer:</strong> 
+                    This prediction is generated by an AI system and should not replace professional medical advice. 
+                    Please consult with a qualified healthcare provider for proper diagnosis and treatment.
+                </p>
+            </div>
+        </div>
+    </div>
+{% endblock %}
+'''
+
+SCREENING_FORM = '''
+{% extends 'base.html' %}
+{% block title %}Full Health Screening{% endblock %}
+{% block body_class %}page-form theme-screening{% endblock %}
+{% block content %}
     <div class="form-container">
         <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
-        <h2><i class="fas fa-heart"></i> Heart Disease Prediction</h2>
+        <h2><i class="fas fa-notes-medical"></i> Full Health Screening</h2>
         <div class="info-box">
-            <strong><i class="fas fa-info-circle"></i> Information:</strong> Cardiovascular assessment based on clinical parameters.
+            <strong><i class="fas fa-info-circle"></i> Information:</strong> Enter whatever measurements you have; all five risk models are run on one submission. A disease is only assessed when all of its fields are filled in, and the rest are listed as not assessed.
         </div>
-        <form action="/predict/heart" method="POST">
+        <form action="/screening" method="POST">
             <div class="row">
                 <div class="col-md-6 mb-3">
                     <label class="form-label">Full Name *</label>
@@ -1162,11 +3363,50 @@ HEART_FORM = '''
                 </div>
             </div>
             
-            <h5 class="mt-4 mb-3">Cardiovascular Parameters</h5>
+            <h5 class="section-title" style="border-left-color: #e74c3c;"><i class="fas fa-pills"></i> Diabetes</h5>
+            <div class="row">
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Glucose Level (mg/dL)</label>
+                    <input type="number" step="0.01" name="glucose" class="form-control" placeholder="e.g., 120">
+                    <small class="text-muted">Fasting: 70-100 mg/dL (normal)</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Blood Pressure (mmHg)</label>
+                    <input type="number" step="0.01" name="blood_pressure" class="form-control" placeholder="e.g., 80">
+                    <small class="text-muted">Diastolic; also used for the kidney screen</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Skin Thickness (mm)</label>
+                    <input type="number" step="0.01" name="skin_thickness" class="form-control" placeholder="e.g., 20">
+                    <small class="text-muted">Triceps skinfold</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Insulin Level (μU/mL)</label>
+                    <input type="number" step="0.01" name="insulin" class="form-control" placeholder="e.g., 80">
+                    <small class="text-muted">Normal: 16-166 μU/mL</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">BMI (Body Mass Index)</label>
+                    <input type="number" step="0.01" name="bmi" class="form-control" placeholder="e.g., 25.5">
+                    <small class="text-muted">Normal: 18.5-24.9; also used for the stroke screen</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Diabetes Pedigree Function</label>
+                    <input type="number" step="0.001" name="dpf" class="form-control" placeholder="e.g., 0.5">
+                    <small class="text-muted">Family history factor</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Number of Pregnancies</label>
+                    <input type="number" name="pregnancies" class="form-control" placeholder="e.g., 0" value="0">
+                    <small class="text-muted">For females only</small>
+                </div>
+            </div>
+            
+            <h5 class="section-title" style="border-left-color: #c0392b;"><i class="fas fa-heart"></i> Heart Disease</h5>
             <div class="row">
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Chest Pain Type *</label>
-                    <select name="cp" class="form-control" required>
+                    <label class="form-label">Chest Pain Type</label>
+                    <select name="cp" class="form-control">
                         <option value="0">Typical Angina</option>
                         <option value="1">Atypical Angina</option>
                         <option value="2">Non-anginal Pain</option>
@@ -1174,63 +3414,63 @@ HEART_FORM = '''
                     </select>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Resting BP (mmHg) *</label>
-                    <input type="number" name="trestbps" class="form-control" placeholder="e.g., 120" required>
+                    <label class="form-label">Resting BP (mmHg)</label>
+                    <input type="number" name="trestbps" class="form-control" placeholder="e.g., 120">
                     <small class="text-muted">Normal: 90-120</small>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Cholesterol (mg/dL) *</label>
-                    <input type="number" name="chol" class="form-control" placeholder="e.g., 200" required>
+                    <label class="form-label">Cholesterol (mg/dL)</label>
+                    <input type="number" name="chol" class="form-control" placeholder="e.g., 200">
                     <small class="text-muted">Normal: <200</small>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Fasting Blood Sugar *</label>
-                    <select name="fbs" class="form-control" required>
+                    <label class="form-label">Fasting Blood Sugar</label>
+                    <select name="fbs" class="form-control">
                         <option value="0">&lt; 120 mg/dL</option>
                         <option value="1">&gt; 120 mg/dL</option>
                     </select>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Resting ECG *</label>
-                    <select name="restecg" class="form-control" required>
+                    <label class="form-label">Resting ECG</label>
+                    <select name="restecg" class="form-control">
                         <option value="0">Normal</option>
                         <option value="1">ST-T Abnormality</option>
                         <option value="2">LV Hypertrophy</option>
                     </select>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Max Heart Rate *</label>
-                    <input type="number" name="thalach" class="form-control" placeholder="e.g., 150" required>
+                    <label class="form-label">Max Heart Rate</label>
+                    <input type="number" name="thalach" class="form-control" placeholder="e.g., 150">
                     <small class="text-muted">Achieved during exercise</small>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Exercise Induced Angina *</label>
-                    <select name="exang" class="form-control" required>
+                    <label class="form-label">Exercise Induced Angina</label>
+                    <select name="exang" class="form-control">
                         <option value="0">No</option>
                         <option value="1">Yes</option>
                     </select>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">ST Depression *</label>
-                    <input type="number" step="0.1" name="oldpeak" class="form-control" placeholder="e.g., 1.0" required>
+                    <label class="form-label">ST Depression</label>
+                    <input type="number" step="0.1" name="oldpeak" class="form-control" placeholder="e.g., 1.0">
                     <small class="text-muted">Induced by exercise</small>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Slope of ST *</label>
-                    <select name="slope" class="form-control" required>
+                    <label class="form-label">Slope of ST</label>
+                    <select name="slope" class="form-control">
                         <option value="0">Upsloping</option>
                         <option value="1">Flat</option>
                         <option value="2">Downsloping</option>
                     </select>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Major Vessels *</label>
-                    <input type="number" name="ca" class="form-control" min="0" max="4" placeholder="0-4" required>
+                    <label class="form-label">Major Vessels</label>
+                    <input type="number" name="ca" class="form-control" min="0" max="4" placeholder="0-4">
                     <small class="text-muted">Colored by fluoroscopy</small>
                 </div>
                 <div class="col-md-4 mb-3">
-                    <label class="form-label">Thalassemia *</label>
-                    <select name="thal" class="form-control" required>
+                    <label class="form-label">Thalassemia</label>
+                    <select name="thal" class="form-control">
                         <option value="0">Normal</option>
                         <option value="1">Fixed Defect</option>
                         <option value="2">Reversible Defect</option>
@@ -1238,388 +3478,129 @@ HEART_FORM = '''
                 </div>
             </div>
             
-            <div class="mt-4 text-center">
-                <button type="submit" class="btn btn-submit">
-                    <i class="fas fa-heartbeat"></i> Analyze Heart Health
-                </button>
-            </div>
-        </form>
-    </div>
-</body>
-</html>
-'''
-
-LIVER_FORM = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Liver Disease Detection</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        body {
-            background: linear-gradient(135deg, #d35400 0%, #e67e22 100%);
-            min-height: 100vh;
-            padding: 20px 0;
-        }
-        .form-container {
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }
-        h2 { color: #d35400; margin-bottom: 30px; }
-        .form-label { font-weight: 600; color: #333; }
-        .form-control:focus { border-color: #d35400; box-shadow: 0 0 0 0.2rem rgba(211, 84, 0, 0.25); }
-        .btn-submit {
-            background: linear-gradient(135deg, #d35400, #e67e22);
-            color: white;
-            border: none;
-            padding: 12px 40px;
-            border-radius: 25px;
-            font-weight: bold;
-        }
-        .btn-submit:hover { transform: scale(1.05); color: white; }
-        .info-box {
-            background: #fff3cd;
-            border-left: 4px solid #ffc107;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-    </style>
-</head>
-<body>
-    <div class="form-container">
-        <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
-        <h2><i class="fas fa-user-md"></i> Liver Disease Detection</h2>
-        <div class="info-box">
-            <strong><i class="fas fa-info-circle"></i> Information:</strong> Liver function assessment based on enzymatic tests.
-        </div>
-        <form action="/predict/liver" method="POST">
-            <div class="row">
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Full Name *</label>
-                    <input type="text" name="name" class="form-control" required>
-                </div>
-                <div class="col-md-3 mb-3">
-                    <label class="form-label">Age *</label>
-                    <input type="number" name="age" class="form-control" min="1" max="120" required>
-                </div>
-                <div class="col-md-3 mb-3">
-                    <label class="form-label">Gender *</label>
-                    <select name="gender" class="form-control" required>
-                        <option value="">Select</option>
-                        <option value="Male">Male</option>
-                        <option value="Female">Female</option>
-                        <option value="Other">Other</option>
-                    </select>
-                </div>
-            </div>
-            
-            <h5 class="mt-4 mb-3">Liver Function Tests</h5>
+            <h5 class="section-title" style="border-left-color: #d35400;"><i class="fas fa-user-md"></i> Liver Disease</h5>
             <div class="row">
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Total Bilirubin (mg/dL) *</label>
-                    <input type="number" step="0.01" name="total_bilirubin" class="form-control" placeholder="e.g., 0.8" required>
+                    <label class="form-label">Total Bilirubin (mg/dL)</label>
+                    <input type="number" step="0.01" name="total_bilirubin" class="form-control" placeholder="e.g., 0.8">
                     <small class="text-muted">Normal: 0.1-1.2 mg/dL</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Direct Bilirubin (mg/dL) *</label>
-                    <input type="number" step="0.01" name="direct_bilirubin" class="form-control" placeholder="e.g., 0.3" required>
+                    <label class="form-label">Direct Bilirubin (mg/dL)</label>
+                    <input type="number" step="0.01" name="direct_bilirubin" class="form-control" placeholder="e.g., 0.3">
                     <small class="text-muted">Normal: 0.0-0.3 mg/dL</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Alkaline Phosphatase (IU/L) *</label>
-                    <input type="number" name="alkaline_phosphotase" class="form-control" placeholder="e.g., 200" required>
+                    <label class="form-label">Alkaline Phosphatase (IU/L)</label>
+                    <input type="number" name="alkaline_phosphotase" class="form-control" placeholder="e.g., 200">
                     <small class="text-muted">Normal: 44-147 IU/L</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Alamine Aminotransferase (IU/L) *</label>
-                    <input type="number" name="alamine_aminotransferase" class="form-control" placeholder="e.g., 30" required>
+                    <label class="form-label">Alamine Aminotransferase (IU/L)</label>
+                    <input type="number" name="alamine_aminotransferase" class="form-control" placeholder="e.g., 30">
                     <small class="text-muted">Normal: 7-56 IU/L</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Aspartate Aminotransferase (IU/L) *</label>
-                    <input type="number" name="aspartate_aminotransferase" class="form-control" placeholder="e.g., 35" required>
+                    <label class="form-label">Aspartate Aminotransferase (IU/L)</label>
+                    <input type="number" name="aspartate_aminotransferase" class="form-control" placeholder="e.g., 35">
                     <small class="text-muted">Normal: 10-40 IU/L</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Total Proteins (g/dL) *</label>
-                    <input type="number" step="0.01" name="total_proteins" class="form-control" placeholder="e.g., 7.0" required>
+                    <label class="form-label">Total Proteins (g/dL)</label>
+                    <input type="number" step="0.01" name="total_proteins" class="form-control" placeholder="e.g., 7.0">
                     <small class="text-muted">Normal: 6.0-8.3 g/dL</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Albumin (g/dL) *</label>
-                    <input type="number" step="0.01" name="albumin" class="form-control" placeholder="e.g., 4.0" required>
+                    <label class="form-label">Albumin (g/dL)</label>
+                    <input type="number" step="0.01" name="albumin" class="form-control" placeholder="e.g., 4.0">
                     <small class="text-muted">Normal: 3.5-5.5 g/dL</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Albumin/Globulin Ratio *</label>
-                    <input type="number" step="0.01" name="ag_ratio" class="form-control" placeholder="e.g., 1.2" required>
+                    <label class="form-label">Albumin/Globulin Ratio</label>
+                    <input type="number" step="0.01" name="ag_ratio" class="form-control" placeholder="e.g., 1.2">
                     <small class="text-muted">Normal: 1.0-2.5</small>
                 </div>
             </div>
             
-            <div class="mt-4 text-center">
-                <button type="submit" class="btn btn-submit">
-                    <i class="fas fa-flask"></i> Analyze Liver Function
-                </button>
-            </div>
-        </form>
-    </div>
-</body>
-</html>
-'''
-
-KIDNEY_FORM = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Kidney Disease Screening</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        body {
-            background: linear-gradient(135deg, #2980b9 0%, #3498db 100%);
-            min-height: 100vh;
-            padding: 20px 0;
-        }
-        .form-container {
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }
-        h2 { color: #2980b9; margin-bottom: 30px; }
-        .form-label { font-weight: 600; color: #333; }
-        .form-control:focus { border-color: #2980b9; box-shadow: 0 0 0 0.2rem rgba(41, 128, 185, 0.25); }
-        .btn-submit {
-            background: linear-gradient(135deg, #2980b9, #3498db);
-            color: white;
-            border: none;
-            padding: 12px 40px;
-            border-radius: 25px;
-            font-weight: bold;
-        }
-        .btn-submit:hover { transform: scale(1.05); color: white; }
-        .info-box {
-            background: #fff3cd;
-            border-left: 4px solid #ffc107;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-    </style>
-</head>
-<body>
-    <div class="form-container">
-        <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
-        <h2><i class="fas fa-kidney"></i> Kidney Disease Screening</h2>
-        <div class="info-box">
-            <strong><i class="fas fa-info-circle"></i> Information:</strong> Kidney function assessment based on blood and urine tests.
-        </div>
-        <form action="/predict/kidney" method="POST">
-            <div class="row">
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Full Name *</label>
-                    <input type="text" name="name" class="form-control" required>
-                </div>
-                <div class="col-md-3 mb-3">
-                    <label class="form-label">Age *</label>
-                    <input type="number" name="age" class="form-control" min="1" max="120" required>
-                </div>
-                <div class="col-md-3 mb-3">
-                    <label class="form-label">Gender *</label>
-                    <select name="gender" class="form-control" required>
-                        <option value="">Select</option>
-                        <option value="Male">Male</option>
-                        <option value="Female">Female</option>
-                        <option value="Other">Other</option>
-                    </select>
-                </div>
-            </div>
-            
-            <h5 class="mt-4 mb-3">Kidney Function Tests</h5>
+            <h5 class="section-title" style="border-left-color: #2980b9;"><i class="fas fa-kidney"></i> Kidney Disease</h5>
             <div class="row">
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Blood Pressure (mmHg) *</label>
-                    <input type="number" name="blood_pressure" class="form-control" placeholder="e.g., 80" required>
-                    <small class="text-muted">Diastolic BP</small>
-                </div>
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Specific Gravity *</label>
-                    <input type="number" step="0.001" name="specific_gravity" class="form-control" placeholder="e.g., 1.020" required>
+                    <label class="form-label">Specific Gravity</label>
+                    <input type="number" step="0.001" name="specific_gravity" class="form-control" placeholder="e.g., 1.020">
                     <small class="text-muted">Urine specific gravity (1.003-1.030)</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Albumin Level *</label>
-                    <input type="number" name="albumin" class="form-control" placeholder="e.g., 0-5" required>
+                    <label class="form-label">Urine Albumin Level</label>
+                    <input type="number" name="kidney_albumin" class="form-control" placeholder="e.g., 0-5">
                     <small class="text-muted">0=normal, 5=high</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Sugar Level *</label>
-                    <input type="number" name="sugar" class="form-control" placeholder="e.g., 0-5" required>
+                    <label class="form-label">Sugar Level</label>
+                    <input type="number" name="sugar" class="form-control" placeholder="e.g., 0-5">
                     <small class="text-muted">0=normal, 5=high</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Red Blood Cells *</label>
-                    <select name="red_blood_cells" class="form-control" required>
+                    <label class="form-label">Red Blood Cells</label>
+                    <select name="red_blood_cells" class="form-control">
                         <option value="0">Normal</option>
                         <option value="1">Abnormal</option>
                     </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Pus Cells *</label>
-                    <select name="pus_cell" class="form-control" required>
+                    <label class="form-label">Pus Cells</label>
+                    <select name="pus_cell" class="form-control">
                         <option value="0">Normal</option>
                         <option value="1">Abnormal</option>
                     </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Blood Urea (mg/dL) *</label>
-                    <input type="number" step="0.1" name="blood_urea" class="form-control" placeholder="e.g., 30" required>
+                    <label class="form-label">Blood Urea (mg/dL)</label>
+                    <input type="number" step="0.1" name="blood_urea" class="form-control" placeholder="e.g., 30">
                     <small class="text-muted">Normal: 7-20 mg/dL</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Serum Creatinine (mg/dL) *</label>
-                    <input type="number" step="0.1" name="serum_creatinine" class="form-control" placeholder="e.g., 1.0" required>
+                    <label class="form-label">Serum Creatinine (mg/dL)</label>
+                    <input type="number" step="0.1" name="serum_creatinine" class="form-control" placeholder="e.g., 1.0">
                     <small class="text-muted">Normal: 0.6-1.2 mg/dL</small>
                 </div>
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Sodium (mEq/L) *</label>
-                    <input type="number" step="0.1" name="sodium" class="form-control" placeholder="e.g., 140" required>
-                    <small class="text-muted">Normal: 135-145 mEq/L</small>
-                </div>
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Potassium (mEq/L) *</label>
-                    <input type="number" step="0.1" name="potassium" class="form-control" placeholder="e.g., 4.5" required>
-                    <small class="text-muted">Normal: 3.5-5.0 mEq/L</small>
-                </div>
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Hemoglobin (g/dL) *</label>
-                    <input type="number" step="0.1" name="hemoglobin" class="form-control" placeholder="e.g., 14" required>
-                    <small class="text-muted">Normal: 12-18 g/dL</small>
-                </div>
-            </div>
-            
-            <div class="mt-4 text-center">
-                <button type="submit" class="btn btn-submit">
-                    <i class="fas fa-vial"></i> Analyze Kidney Function
-                </button>
-            </div>
-        </form>
-    </div>
-</body>
-</html>
-'''
-
-STROKE_FORM = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Stroke Risk Prediction</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        body {
-            background: linear-gradient(135deg, #8e44ad 0%, #9b59b6 100%);
-            min-height: 100vh;
-            padding: 20px 0;
-        }
-        .form-container {
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }
-        h2 { color: #8e44ad; margin-bottom: 30px; }
-        .form-label { font-weight: 600; color: #333; }
-        .form-control:focus { border-color: #8e44ad; box-shadow: 0 0 0 0.2rem rgba(142, 68, 173, 0.25); }
-        .btn-submit {
-            background: linear-gradient(135deg, #8e44ad, #9b59b6);
-            color: white;
-            border: none;
-            padding: 12px 40px;
-            border-radius: 25px;
-            font-weight: bold;
-        }
-        .btn-submit:hover { transform: scale(1.05); color: white; }
-        .info-box {
-            background: #fff3cd;
-            border-left: 4px solid #ffc107;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-    </style>
-</head>
-<body>
-    <div class="form-container">
-        <a href="/" class="btn btn-outline-secondary mb-3"><i class="fas fa-arrow-left"></i> Back to Home</a>
-        <h2><i class="fas fa-brain"></i> Stroke Risk Prediction</h2>
-        <div class="info-box">
-            <strong><i class="fas fa-info-circle"></i> Information:</strong> Assess stroke risk based on lifestyle and medical factors.
-        </div>
-        <form action="/predict/stroke" method="POST">
-            <div class="row">
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Full Name *</label>
-                    <input type="text" name="name" class="form-control" required>
-                </div>
-                <div class="col-md-3 mb-3">
-                    <label class="form-label">Age *</label>
-                    <input type="number" name="age" class="form-control" min="1" max="120" required>
-                </div>
-                <div class="col-md-3 mb-3">
-                    <label class="form-label">Gender *</label>
-                    <select name="gender" class="form-control" required>
-                        <option value="">Select</option>
-                        <option value="Male">Male</option>
-                        <option value="Female">Female</option>
-                        <option value="Other">Other</option>
-                    </select>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Sodium (mEq/L)</label>
+                    <input type="number" step="0.1" name="sodium" class="form-control" placeholder="e.g., 140">
+                    <small class="text-muted">Normal: 135-145 mEq/L</small>
+                </div>
+                <div class="col-md-6 mb-3">
+                    <label class="form-label">Potassium (mEq/L)</label>
+                    <input type="number" step="0.1" name="potassium" class="form-control" placeholder="e.g., 4.5">
+                    <small class="text-muted">Normal: 3.5-5.0 mEq/L</small>
                 </div>
             </div>
             
-            <h5 class="mt-4 mb-3">Stroke Risk Factors</h5>
+            <h5 class="section-title" style="border-left-color: #8e44ad;"><i class="fas fa-brain"></i> Stroke</h5>
             <div class="row">
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Hypertension *</label>
-                    <select name="hypertension" class="form-control" required>
+                    <label class="form-label">Hypertension</label>
+                    <select name="hypertension" class="form-control">
                         <option value="0">No</option>
                         <option value="1">Yes</option>
                     </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Heart Disease *</label>
-                    <select name="heart_disease" class="form-control" required>
+                    <label class="form-label">Heart Disease</label>
+                    <select name="heart_disease" class="form-control">
                         <option value="0">No</option>
                         <option value="1">Yes</option>
                     </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Ever Married *</label>
-                    <select name="ever_married" class="form-control" required>
+                    <label class="form-label">Ever Married</label>
+                    <select name="ever_married" class="form-control">
                         <option value="0">No</option>
                         <option value="1">Yes</option>
                     </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Work Type *</label>
-                    <select name="work_type" class="form-control" required>
+                    <label class="form-label">Work Type</label>
+                    <select name="work_type" class="form-control">
                         <option value="0">Never Worked</option>
                         <option value="1">Children</option>
                         <option value="2">Government Job</option>
@@ -1628,25 +3609,20 @@ STROKE_FORM = '''
                     </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Residence Type *</label>
-                    <select name="residence_type" class="form-control" required>
+                    <label class="form-label">Residence Type</label>
+                    <select name="residence_type" class="form-control">
                         <option value="0">Rural</option>
                         <option value="1">Urban</option>
                     </select>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">Average Glucose Level (mg/dL) *</label>
-                    <input type="number" step="0.01" name="avg_glucose_level" class="form-control" placeholder="e.g., 100" required>
+                    <label class="form-label">Average Glucose Level (mg/dL)</label>
+                    <input type="number" step="0.01" name="avg_glucose_level" class="form-control" placeholder="e.g., 100">
                     <small class="text-muted">Normal: 70-100 mg/dL</small>
                 </div>
                 <div class="col-md-6 mb-3">
-                    <label class="form-label">BMI *</label>
-                    <input type="number" step="0.1" name="bmi" class="form-control" placeholder="e.g., 25.5" required>
-                    <small class="text-muted">Normal: 18.5-24.9</small>
-                </div>
-                <div class="col-md-6 mb-3">
-                    <label class="form-label">Smoking Status *</label>
-                    <select name="smoking_status" class="form-control" required>
+                    <label class="form-label">Smoking Status</label>
+                    <select name="smoking_status" class="form-control">
                         <option value="0">Never Smoked</option>
                         <option value="1">Formerly Smoked</option>
                         <option value="2">Smokes</option>
@@ -1657,113 +3633,23 @@ STROKE_FORM = '''
             
             <div class="mt-4 text-center">
                 <button type="submit" class="btn btn-submit">
-                    <i class="fas fa-brain"></i> Analyze Stroke Risk
+                    <i class="fas fa-chart-line"></i> Run Full Screening
                 </button>
             </div>
         </form>
     </div>
-</body>
-</html>
+{% endblock %}
 '''
 
-RESULT_TEMPLATE = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{ disease.title() }} Prediction Results</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        body {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px 0;
-        }
-        .results-container {
-            max-width: 1000px;
-            margin: 0 auto;
-        }
-        .card {
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            margin-bottom: 20px;
-        }
-        .card-header {
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-            font-weight: bold;
-            border-radius: 15px 15px 0 0 !important;
-        }
-        .prediction-result {
-            padding: 30px;
-            text-align: center;
-        }
-        .prediction-result.positive {
-            background: linear-gradient(135deg, #dc3545, #c82333);
-            color: white;
-        }
-        .prediction-result.negative {
-            background: linear-gradient(135deg, #28a745, #218838);
-            color: white;
-        }
-        .gauge-container {
-            text-align: center;
-            padding: 20px;
-        }
-        .gauge-container img {
-            max-width: 100%;
-            height: auto;
-        }
-        .recommendation-section {
-            padding: 20px;
-        }
-        .recommendation-item {
-            background: #f8f9fa;
-            padding: 15px;
-            margin-bottom: 10px;
-            border-radius: 8px;
-            border-left: 4px solid;
-        }
-        .recommendation-item.lifestyle { border-left-color: #007bff; }
-        .recommendation-item.diet { border-left-color: #28a745; }
-        .recommendation-item.medical { border-left-color: #dc3545; }
-        .recommendation-item.prevention { border-left-color: #ffc107; }
-        .recommendation-item h5 {
-            margin-bottom: 10px;
-            font-weight: bold;
-        }
-        .recommendation-item ul {
-            margin: 0;
-            padding-left: 20px;
-        }
-        .btn-download {
-            background: linear-gradient(135deg, #28a745, #218838);
-            color: white;
-            border: none;
-            padding: 12px 30px;
-            border-radius: 25px;
-            font-weight: bold;
-            margin: 5px;
-        }
-        .btn-download:hover {
-            transform: scale(1.05);
-            color: white;
-        }
-        .patient-info {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-        }
-    </style>
-</head>
-<body>
+SCREENING_RESULT_TEMPLATE = '''
+{% extends 'base.html' %}
+{% block title %}Full Health Screening Results{% endblock %}
+{% block body_class %}page-screening-results{% endblock %}
+{% block content %}
     <div class="results-container">
         <div class="card">
             <div class="card-header">
-                <h3><i class="fas fa-file-medical"></i> {{ disease.title() }} Prediction Results</h3>
+                <h3><i class="fas fa-notes-medical"></i> Full Health Screening Results</h3>
             </div>
             <div class="card-body">
                 <div class="patient-info">
@@ -1780,95 +3666,70 @@ RESULT_TEMPLATE = '''
                     </div>
                 </div>
                 
-                <div class="prediction-result {% if prediction == 1 %}positive{% else %}negative{% endif %}">
-                    <h1>
-                        {% if prediction == 1 %}
-                        <i class="fas fa-exclamation-triangle"></i> POSITIVE
-                        {% else %}
-                        <i class="fas fa-check-circle"></i> NEGATIVE
-                        {% endif %}
-                    </h1>
-                    <h3>
-                        {% if prediction == 1 %}
-                        Risk Detected - Medical Consultation Recommended
-                        {% else %}
-                        Low Risk - Continue Healthy Lifestyle
-                        {% endif %}
-                    </h3>
-                    <h2 class="mt-3">Risk Probability: {{ "%.1f"|format(probability * 100) }}%</h2>
-                    <h4>Risk Level: <span class="badge bg-light text-dark">{{ risk_level.upper() }}</span></h4>
-                </div>
+                <table class="table table-hover align-middle">
+                    <thead>
+                        <tr>
+                            <th>Disease</th>
+                            <th>Prediction</th>
+                            <th>Risk Probability</th>
+                            <th>Risk Level</th>
+                            <th></th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for disease, result in results.items() %}
+                        <tr>
+                            <td><strong>{{ disease.title() }}</strong></td>
+                            {% if result.assessed %}
+                            <td>{% if result.prediction == 1 %}POSITIVE{% else %}NEGATIVE{% endif %}</td>
+                            <td>{{ "%.1f"|format(result.probability * 100) }}%</td>
+                            <td><span class="badge bg-{{ result.badge_color }}">{{ result.risk_level.upper() }}</span></td>
+                            {% else %}
+                            <td colspan="2" class="text-muted small">Missing: {{ result.missing|join(', ') }}</td>
+                            <td><span class="badge bg-secondary">NOT ASSESSED</span></td>
+                            {% endif %}
+                            <td><a href="/predict/{{ disease }}" class="btn btn-sm btn-outline-secondary">Detailed assessment</a></td>
+                        </tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
             </div>
         </div>
         
+        {% if screening_chart_url %}
         <div class="card">
             <div class="card-header">
-                <h4><i class="fas fa-tachometer-alt"></i> Risk Assessment Gauge</h4>
+                <h4><i class="fas fa-chart-bar"></i> Risk Overview</h4>
             </div>
-            <div class="card-body gauge-container">
-                <img src="data:image/png;base64,{{ gauge_chart }}" alt="Risk Gauge">
+            <div class="card-body chart-container">
+                <img src="{{ screening_chart_url }}" alt="Risk Overview">
             </div>
         </div>
+        {% endif %}
         
         <div class="card">
             <div class="card-header">
-                <h4><i class="fas fa-clipboard-list"></i> Personalized Recommendations</h4>
+                <h4><i class="fas fa-stethoscope"></i> Medical Advice</h4>
             </div>
-            <div class="card-body recommendation-section">
-                {% if recommendations.lifestyle %}
-                <div class="recommendation-item lifestyle">
-                    <h5><i class="fas fa-running"></i> Lifestyle Modifications</h5>
-                    <ul>
-                        {% for rec in recommendations.lifestyle %}
-                        <li>{{ rec }}</li>
-                        {% endfor %}
-                    </ul>
-                </div>
-                {% endif %}
-                
-                {% if recommendations.diet %}
-                <div class="recommendation-item diet">
-                    <h5><i class="fas fa-utensils"></i> Dietary Recommendations</h5>
-                    <ul>
-                        {% for rec in recommendations.diet %}
-                        <li>{{ rec }}</li>
-                        {% endfor %}
-                    </ul>
-                </div>
-                {% endif %}
-                
-                {% if recommendations.medical %}
-                <div class="recommendation-item medical">
-                    <h5><i class="fas fa-stethoscope"></i> Medical Advice</h5>
-                    <ul>
-                        {% for rec in recommendations.medical %}
-                        <li>{{ rec }}</li>
-                        {% endfor %}
-                    </ul>
-                </div>
-                {% endif %}
-                
-                {% if recommendations.prevention %}
-                <div class="recommendation-item prevention">
-                    <h5><i class="fas fa-shield-alt"></i> Prevention Strategies</h5>
+            <div class="card-body">
+                {% for disease, result in results.items() if result.assessed %}
+                <div class="recommendation-item">
+                    <h5>{{ disease.title() }} <span class="badge bg-{{ result.badge_color }}">{{ result.risk_level.upper() }}</span></h5>
                     <ul>
-                        {% for rec in recommendations.prevention %}
+                        {% for rec in result.recommendations.medical %}
                         <li>{{ rec }}</li>
                         {% endfor %}
                     </ul>
                 </div>
-                {% endif %}
+                {% endfor %}
             </div>
         </div>
         
         <div class="text-center mb-4">
-            <a href="/download/pdf" class="btn btn-download">
-                <i class="fas fa-file-pdf"></i> Download PDF Report
-            </a>
-            <a href="/download/csv" class="btn btn-download">
-                <i class="fas fa-file-csv"></i> Download CSV Data
+            <a href="/screening" class="btn btn-download">
+                <i class="fas fa-redo"></i> New Screening
             </a>
-            <a href="/" class="btn btn-download" style="background: linear-gradient(135deg, #007bff, #0056b3);">
+            <a href="/" class="btn btn-download">
                 <i class="fas fa-home"></i> Back to Home
             </a>
         </div>
@@ -1883,31 +3744,199 @@ RESULT_TEMPLATE = '''
             </div>
         </div>
     </div>
-</body>
-</html>
+{% endblock %}
 '''
 
 
+# Page templates by name. They are compiled once by compile_templates() and
+# served from the Jinja environment's cache, instead of being recompiled
+# from source by render_template_string() on every request.
+TEMPLATES = {
+    'base.html': BASE_TEMPLATE,
+    'home.html': HOME_TEMPLATE,
+    'diabetes_form.html': DIABETES_FORM,
+    'heart_form.html': HEART_FORM,
+    'liver_form.html': LIVER_FORM,
+    'kidney_form.html': KIDNEY_FORM,
+    'stroke_form.html': STROKE_FORM,
+    'result.html': RESULT_TEMPLATE,
+    'screening_form.html': SCREENING_FORM,
+    'screening_result.html': SCREENING_RESULT_TEMPLATE
+}
+app.jinja_loader = DictLoader(TEMPLATES)
+
+
+# Pages that do not depend on the request, rendered once by
+# prerender_pages().
+STATIC_PAGES = ('home.html', 'diabetes_form.html', 'heart_form.html',
+                'liver_form.html', 'kidney_form.html', 'stroke_form.html',
+                'screening_form.html')
+PRERENDERED_PAGES = {}
+
+# Files under static/ served at content-hashed URLs by fingerprint_assets().
+STATIC_DIR = os.path.join(app.root_path, 'static')
+# A stylesheet must come after the files its url() references point at, so
+# it can be rewritten to their hashed names before being hashed itself.
+STATIC_ASSETS = (
+    'vendor/bootstrap-5.3.0/css/bootstrap.min.css',
+    'vendor/fontawesome-6.4.0/webfonts/fa-solid-900.woff2',
+    'vendor/fontawesome-6.4.0/webfonts/fa-solid-900.ttf',
+    'vendor/fontawesome-6.4.0/css/fontawesome.min.css',
+    'vendor/fontawesome-6.4.0/css/solid.min.css',
+    'css/app.css',
+)
+# Its per-icon rules are pruned to the icons the templates use.
+ICON_STYLESHEET = 'vendor/fontawesome-6.4.0/css/fontawesome.min.css'
+ASSET_URLS = {}
+ASSETS = {}
+
+
+def compile_templates():
+    for name in TEMPLATES:
+        app.jinja_env.get_template(name)
+
+
+def encoded_variants(body, compress=True):
+    # The body as {encoding: (bytes, etag)}, compressed ahead of time: gzip
+    # always, brotli when the optional brotli package is installed. Every
+    # encoding gets its own ETag, since the bytes differ.
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    encodings = {'identity': body}
+    if compress:
+        encodings['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        try:
+            import brotli
+        except ImportError:
+            pass
+        else:
+            encodings['br'] = brotli.compress(body, quality=11)
+    return {
+        encoding: (data, f'{digest}-{encoding}')
+        for encoding, data in encodings.items()
+    }
+
+
+def negotiated_response(encodings, mimetype):
+    for encoding in ('br', 'gzip', 'identity'):
+        if encoding in encodings and (encoding == 'identity' or
+                                      request.accept_encodings[encoding]):
+            break
+    body, etag = encodings[encoding]
+    response = Response(body, mimetype=mimetype)
+    if encoding != 'identity':
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    return response
+
+
+def rewrite_css_urls(css, path):
+    # Point url() references at the hashed names of assets fingerprinted
+    # before this one. The hashed file sits next to the original, so the
+    # reference stays relative and works wherever the app is mounted.
+    base = posixpath.dirname(path)
+
+    def replace(match):
+        target = posixpath.normpath(posixpath.join(base, match.group(2)))
+        if target not in ASSET_URLS:
+            return match.group(0)
+        return f'url({posixpath.relpath(ASSET_URLS[target], base)})'
+
+    return re.sub(r'url\(([\'"]?)(?!data:)([^\'")]+)\1\)', replace, css)
+
+
+def prune_icon_rules(css):
+    # Font Awesome ships a content rule for every icon; keep the selectors
+    # for the icon classes the templates mention and drop the rest.
+    used = set()
+    for source in TEMPLATES.values():
+        used.update(re.findall(r'fa-[a-z0-9-]+', source))
+
+    def replace(match):
+        selectors = [selector for selector in match.group(1).split(',')
+                     if selector[1:-len(':before')] in used]
+        if not selectors:
+            return ''
+        return ','.join(selectors) + match.group(2)
+
+    return re.sub(r'((?:\.fa-[a-z0-9-]+:before,?)+)(\{content:"[^"]*"\})',
+                  replace, css)
+
+
+def fingerprint_assets():
+    # Serve each asset at <name>.<content hash>.<ext> so it can be cached
+    # forever; a changed file gets a new URL.
+    import mimetypes
+
+    mimetypes.add_type('font/woff2', '.woff2')
+    mimetypes.add_type('font/ttf', '.ttf')
+    for path in STATIC_ASSETS:
+        with open(os.path.join(STATIC_DIR, path), 'rb') as f:
+            body = f.read()
+        if path.endswith('.css'):
+            css = rewrite_css_urls(body.decode('utf-8'), path)
+            if path == ICON_STYLESHEET:
+                css = prune_icon_rules(css)
+            body = css.encode('utf-8')
+        root, ext = os.path.splitext(path)
+        hashed = f'{root}.{hashlib.sha256(body).hexdigest()[:16]}{ext}'
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        compress = mimetype.startswith('text/') or mimetype in (
+            'application/javascript', 'image/svg+xml', 'font/ttf')
+        ASSETS[hashed] = (mimetype, encoded_variants(body, compress))
+        ASSET_URLS[path] = hashed
+
+
+@app.template_global()
+def asset_url(path):
+    if path in ASSET_URLS:
+        return url_for('asset', filename=ASSET_URLS[path])
+    return url_for('static', filename=path)
+
+
+def prerender_pages():
+    with app.test_request_context():
+        for name in STATIC_PAGES:
+            PRERENDERED_PAGES[name] = encoded_variants(
+                render_template(name).encode('utf-8'))
+
+
+def prerendered_page_response(name):
+    encodings = PRERENDERED_PAGES.get(name)
+    if encodings is None:
+        return render_template(name)
+
+    response = negotiated_response(encodings, 'text/html')
+    response.cache_control.public = True
+    response.cache_control.max_age = PAGE_MAX_AGE
+    return response.make_conditional(request)
+
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    entry = ASSETS.get(filename)
+    if entry is None:
+        return "Asset not found", 404
+
+    mimetype, encodings = entry
+    response = negotiated_response(encodings, mimetype)
+    response.cache_control.public = True
+    response.cache_control.max_age = 365 * 24 * 3600
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+
 @app.route('/')
 def home():
-    return render_template_string(HOME_TEMPLATE)
+    return prerendered_page_response('home.html')
 
 
 @app.route('/predict/<disease>', methods=['GET', 'POST'])
 def predict(disease):
     if request.method == 'GET':
-        if disease == 'diabetes':
-            return render_template_string(DIABETES_FORM)
-        elif disease == 'heart':
-            return render_template_string(HEART_FORM)
-        elif disease == 'liver':
-            return render_template_string(LIVER_FORM)
-        elif disease == 'kidney':
-            return render_template_string(KIDNEY_FORM)
-        elif disease == 'stroke':
-            return render_template_string(STROKE_FORM)
-        else:
+        if disease not in FEATURE_COLUMNS:
             return "Disease not found", 404
+        return prerendered_page_response(f'{disease}_form.html')
 
     else:
         form_data = request.form.to_dict()
@@ -1918,88 +3947,43 @@ def predict(disease):
             'gender': form_data.get('gender', 'N/A')
         }
 
-        if disease == 'diabetes':
-            features = np.array([[
-                float(form_data.get('pregnancies', 0)),
-                float(form_data.get('glucose', 0)),
-                float(form_data.get('blood_pressure', 0)),
-                float(form_data.get('skin_thickness', 0)),
-                float(form_data.get('insulin', 0)),
-                float(form_data.get('bmi', 0)),
-                float(form_data.get('dpf', 0)),
-                float(form_data.get('age_model', form_data.get('age', 0)))
-            ]])
-        elif disease == 'heart':
-            features = np.array([[
-                float(form_data.get('age', 0)),
-                float(form_data.get('cp', 0)),
-                float(form_data.get('trestbps', 0)),
-                float(form_data.get('chol', 0)),
-                float(form_data.get('fbs', 0)),
-                float(form_data.get('restecg', 0)),
-                float(form_data.get('thalach', 0)),
-                float(form_data.get('exang', 0)),
-                float(form_data.get('oldpeak', 0)),
-                float(form_data.get('slope', 0)),
-                float(form_data.get('ca', 0)),
-                float(form_data.get('thal', 0))
-            ]])
-        elif disease == 'liver':
-            features = np.array([[
-                float(form_data.get('age', 0)),
-                1 if form_data.get('gender') == 'Male' else 0,
-                float(form_data.get('total_bilirubin', 0)),
-                float(form_data.get('direct_bilirubin', 0)),
-                float(form_data.get('alkaline_phosphotase', 0)),
-                float(form_data.get('alamine_aminotransferase', 0)),
-                float(form_data.get('aspartate_aminotransferase', 0)),
-                float(form_data.get('total_proteins', 0)),
-                float(form_data.get('albumin', 0)),
-                float(form_data.get('ag_ratio', 0))
-            ]])
-        elif disease == 'kidney':
-            features = np.array([[
-                float(form_data.get('age', 0)),
-                float(form_data.get('blood_pressure', 0)),
-                float(form_data.get('specific_gravity', 0)),
-                float(form_data.get('albumin', 0)),
-                float(form_data.get('sugar', 0)),
-                float(form_data.get('red_blood_cells', 0)),
-                float(form_data.get('pus_cell', 0)),
-                float(form_data.get('blood_urea', 0)),
-                float(form_data.get('serum_creatinine', 0)),
-                float(form_data.get('sodium', 0)),
-                float(form_data.get('potassium', 0))
-            ]])
-        elif disease == 'stroke':
-            features = np.array([[
-                float(form_data.get('age', 0)),
-                float(form_data.get('hypertension', 0)),
-                float(form_data.get('heart_disease', 0)),
-                float(form_data.get('ever_married', 0)),
-                float(form_data.get('work_type', 0)),
-                float(form_data.get('residence_type', 0)),
-                float(form_data.get('avg_glucose_level', 0)),
-                float(form_data.get('bmi', 0)),
-                float(form_data.get('smoking_status', 0)), 0
-            ]])
-        else:
+        if disease not in FEATURE_COLUMNS:
             return "Disease type not supported", 404
+        # A blank field still counts as 0, but a value that is not a finite
+        # number is rejected rather than scored (or quoted in the advice).
+        try:
+            features = build_features(disease, form_data)
+        except ValueError as exc:
+            return f"Invalid {disease} value: {exc}", 400
+        if not np.isfinite(features).all():
+            return f"Invalid {disease} value: inputs must be finite", 400
 
-        model = DISEASE_MODELS[disease]
-        scaler = SCALERS[disease]
+        cache_key = prediction_cache_key(disease, features)
+        cached = PREDICTION_CACHE.get(cache_key)
+        if cached is None:
+            # The scaler is folded into the compiled forest's thresholds, so
+            # the raw features go straight in; concurrent rows are batched.
+            prediction, probabilities = score_row(disease, features)
+            probability = float(probabilities[1])
 
-        features_scaled = scaler.transform(features)
-        prediction = model.predict(features_scaled)[0]
-        probability = model.predict_proba(features_scaled)[0][1]
+            risk_level, badge_color = determine_risk_level(probability)
 
-        risk_level, badge_color = determine_risk_level(probability)
+            recommendations = get_recommendations(disease, risk_level,
+                                                  probability, form_data)
 
-        recommendations = get_recommendations(disease, risk_level, probability,
-                                              form_data)
+            cached = (int(prediction), probability, risk_level,
+                      recommendations)
+            PREDICTION_CACHE.set(cache_key, cached)
 
-        gauge_chart = create_gauge_chart(probability,
-                                         f"{disease.title()} Risk Assessment")
+        prediction, probability, risk_level, recommendations = cached
+
+        # The needle is drawn at whole-percent resolution (a 100-tree forest
+        # votes in 1% steps anyway), so every result page shares one of 101
+        # cacheable chart URLs per disease.
+        gauge_url = url_for('gauge_chart',
+                            disease=disease,
+                            percent=int(round(probability * 100)),
+                            v=gauge_fingerprint())
 
         prediction_data = {
             'patient_data': patient_data,
@@ -2008,36 +3992,422 @@ def predict(disease):
             'probability': float(probability),
             'risk_level': risk_level,
             'recommendations': recommendations,
-            'input_data': form_data
+            'input_data': form_data,
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-        session['last_prediction'] = prediction_data
+        prediction_id = secrets.token_urlsafe(16)
+        PREDICTION_STORE.set(prediction_id, json.dumps(prediction_data))
+        session['prediction_id'] = prediction_id
+        # The CSV history export only needs the inputs and the outcome, so
+        # the (long) recommendation lists are left out of the history.
+        history = session.get('prediction_history', [])
+        history.append({
+            key: value
+            for key, value in prediction_data.items()
+            if key != 'recommendations'
+        })
+        session['prediction_history'] = history[-PREDICTION_HISTORY_SIZE:]
         session.permanent = True
-        LAST_PREDICTION_CACHE['latest'] = prediction_data
+        if REPORT_PREGENERATE:
+            # Most users download the report next; render it now so the
+            # download is served from the cache.
+            REPORT_QUEUE.submit(prediction_data)
+
+        return render_template('result.html',
+                               patient_data=patient_data,
+                               disease=disease,
+                               prediction=prediction,
+                               probability=probability,
+                               risk_level=risk_level,
+                               recommendations=recommendations,
+                               gauge_url=gauge_url,
+                               prediction_id=prediction_id)
+
+
+@app.route('/api/v1/predict/<disease>/batch', methods=['POST'])
+def predict_batch_api(disease):
+    if disease not in FEATURE_COLUMNS:
+        return jsonify({'error': f'Unknown disease: {disease}'}), 404
+
+    payload = request.get_json(silent=True)
+    patients = payload.get('patients') if isinstance(payload,
+                                                    dict) else payload
+    if not isinstance(patients, list) or not all(
+            isinstance(patient, dict) for patient in patients):
+        return jsonify({
+            'error': 'Expected a JSON list of patient objects, or an object '
+                     'with a "patients" list'
+        }), 400
+    if len(patients) > API_BATCH_MAX_PATIENTS:
+        return jsonify({
+            'error': f'At most {API_BATCH_MAX_PATIENTS} patients per request'
+        }), 413
+
+    for index, patient in enumerate(patients):
+        problem = invalid_feature(disease, patient)
+        if problem is not None:
+            field, reason = problem
+            return jsonify({
+                'error': f'Patient {index}: "{field}" {reason}',
+                'index': index,
+                'field': field
+            }), 400
+
+    labels, probabilities = score_matrix(disease,
+                                         build_feature_matrix(disease, patients))
+
+    results = []
+    for patient, label, probability in zip(patients, labels.tolist(),
+                                           probabilities[:, 1].tolist()):
+        risk_level, _ = determine_risk_level(probability)
+        results.append({
+            'id': patient.get('id'),
+            'prediction': int(label),
+            'probability': probability,
+            'risk_level': risk_level,
+            'recommendation_key': f'{disease}/{risk_level}'
+        })
+
+    return jsonify({
+        'disease': disease,
+        'model_version': ACTIVE_MODEL_VERSION,
+        'results': results
+    })
+
+
+@app.route('/api/v1/predict/<disease>/csv', methods=['POST'])
+def predict_csv_api(disease):
+    import pandas as pd
+
+    if disease not in FEATURE_COLUMNS:
+        return jsonify({'error': f'Unknown disease: {disease}'}), 404
+
+    upload = request.files.get('file')
+    if upload is not None:
+        # Take ownership of the spooled upload: Flask closes request.files
+        # when the view returns, before the streamed response is consumed.
+        source, upload.stream = upload.stream, io.BytesIO()
+        close_source = source.close
+    elif request.mimetype == 'text/csv':
+        source = request.stream
+        close_source = lambda: None
+    else:
+        return jsonify({
+            'error': 'Upload the roster as a "file" form field or send it as '
+                     'a text/csv body'
+        }), 400
+
+    # Read the upload chunk by chunk so memory stays flat however large the
+    # roster is; every cell stays a string so pass-through columns are
+    # written back exactly as they came in.
+    try:
+        reader = pd.read_csv(source, dtype=str, chunksize=CSV_CHUNK_ROWS)
+        first_chunk = next(reader)
+    except (StopIteration, pd.errors.EmptyDataError):
+        close_source()
+        return jsonify({'error': 'The uploaded CSV is empty'}), 400
+    except pd.errors.ParserError as exc:
+        close_source()
+        return jsonify({'error': f'Could not parse the CSV: {exc}'}), 400
+    missing = missing_frame_columns(disease, first_chunk)
+    if missing:
+        close_source()
+        return jsonify({
+            'error': f'The CSV lacks columns: {", ".join(missing)}',
+            'fields': missing
+        }), 400
+
+    def generate():
+        try:
+            yield score_frame(disease, first_chunk).to_csv(index=False)
+            for chunk in reader:
+                yield score_frame(disease, chunk).to_csv(index=False,
+                                                         header=False)
+        finally:
+            close_source()
+
+    return Response(generate(),
+                    mimetype='text/csv',
+                    headers={
+                        'Content-Disposition':
+                        f'attachment; filename={disease}_scored.csv'
+                    })
+
+
+@app.route('/api/v1/recommendations/<disease>/<risk_level>')
+def recommendations_api(disease, risk_level):
+    if disease not in FEATURE_COLUMNS or risk_level not in ('high', 'medium',
+                                                            'low'):
+        return jsonify({'error': 'Unknown recommendation key'}), 404
+    return jsonify(get_recommendations(disease, risk_level, None, {}))
+
+
+@app.route('/screening', methods=['GET', 'POST'])
+def screening():
+    if request.method == 'GET':
+        return prerendered_page_response('screening_form.html')
+
+    form_data = request.form.to_dict()
+    patient_data = {
+        'name': form_data.get('name', 'N/A'),
+        'age': form_data.get('age', 'N/A'),
+        'gender': form_data.get('gender', 'N/A')
+    }
+
+    try:
+        results = screen_patient(form_data)
+    except ValueError as exc:
+        return f"Invalid screening value: {exc}", 400
+    for disease, result in results.items():
+        if not result['assessed']:
+            continue
+        result['recommendations'] = get_recommendations(
+            disease, result['risk_level'], result['probability'],
+            screening_record(disease, form_data))
+
+    # Like the gauge, the chart is served from a cacheable URL at
+    # whole-percent resolution rather than drawn into every page.
+    percents = {
+        disease: int(round(result['probability'] * 100))
+        for disease, result in results.items() if result['assessed']
+    }
+    screening_chart_url = None
+    if percents:
+        screening_chart_url = url_for('screening_chart',
+                                      v=screening_chart_fingerprint(),
+                                      **percents)
+
+    return render_template('screening_result.html',
+                           patient_data=patient_data,
+                           results=results,
+                           screening_chart_url=screening_chart_url)
+
+
+@app.route('/api/v1/screening', methods=['POST'])
+def screening_api():
+    patient = request.get_json(silent=True)
+    if not isinstance(patient, dict):
+        return jsonify({'error': 'Expected a JSON patient object'}), 400
+
+    try:
+        results = screen_patient(patient)
+    except (TypeError, ValueError) as exc:
+        return jsonify({'error': f'Invalid feature value: {exc}'}), 400
 
-        return render_template_string(RESULT_TEMPLATE,
-                                      patient_data=patient_data,
-                                      disease=disease,
-                                      prediction=prediction,
-                                      probability=probability,
-                                      risk_level=risk_level,
-                                      recommendations=recommendations,
-                                      gauge_chart=gauge_chart)
+    for disease, result in results.items():
+        if result['assessed']:
+            del result['badge_color']
+            result['recommendation_key'] = f"{disease}/{result['risk_level']}"
+
+    return jsonify({
+        'id': patient.get('id'),
+        'model_version': ACTIVE_MODEL_VERSION,
+        'results': results
+    })
+
+
+@app.route('/chart/gauge/<disease>/<int:percent>.svg')
+def gauge_chart(disease, percent):
+    if disease not in FEATURE_COLUMNS or not 0 <= percent <= 100:
+        return "Chart not found", 404
+
+    body, etag = gauge_chart_response_body(disease, percent)
+    response = Response(body, mimetype='image/svg+xml')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 365 * 24 * 3600
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+
+@app.route('/chart/screening.svg')
+def screening_chart():
+    percents = []
+    for disease in FEATURE_COLUMNS:
+        percent = request.args.get(disease, type=int)
+        if percent is None:
+            continue
+        if not 0 <= percent <= 100:
+            return "Chart not found", 404
+        percents.append((disease, percent))
+    if not percents:
+        return "Chart not found", 404
+
+    body, etag = screening_chart_response_body(tuple(percents))
+    response = Response(body, mimetype='image/svg+xml')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 365 * 24 * 3600
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+
+@app.route('/api/v1/cache/stats')
+def cache_stats_api():
+    return jsonify({
+        'model_version': ACTIVE_MODEL_VERSION,
+        'predictions': PREDICTION_CACHE.stats(),
+        'reports': REPORT_CACHE.stats(),
+        'report_jobs': REPORT_QUEUE.jobs.stats()
+    })
+
+
+def stored_prediction(prediction_id=None):
+    # A form prediction by id, defaulting to the session's latest one.
+    prediction_id = prediction_id or session.get('prediction_id')
+    if not prediction_id:
+        return None
+    data = PREDICTION_STORE.get(prediction_id)
+    return json.loads(data) if data is not None else None
+
+
+CSV_PATIENT_FIELDS = ('name', 'age', 'gender')
+CSV_EXPORT_COLUMNS = ('Name', 'Age', 'Gender', 'Disease', 'Prediction',
+                      'Risk_Probability_%', 'Risk_Level', 'Timestamp')
+
+
+def prediction_csv_row(data, input_columns):
+    patient_data = data['patient_data']
+    return [
+        patient_data['name'], patient_data['age'], patient_data['gender'],
+        data['disease'].title(),
+        'Positive' if data['prediction'] == 1 else 'Negative',
+        data['probability'] * 100, data['risk_level'].upper(),
+        data.get('timestamp') or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ] + [data['input_data'].get(column, '') for column in input_columns]
+
+
+def stream_csv(header, rows):
+    # Encode one row at a time through a reused buffer so an export never
+    # holds more than a line in memory.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
 
 
 @app.route('/download/pdf')
 def download_pdf():
-    data = session.get('last_prediction') or LAST_PREDICTION_CACHE.get(
-        'latest')
+    data = stored_prediction(request.args.get('id'))
     if not data:
         return "No prediction data found. Please complete a disease assessment first.", 404
-    pdf_file = generate_pdf_report(data['patient_data'], data['disease'],
-                                   data['prediction'], data['probability'],
-                                   data['recommendations'])
+    return report_response(data, report_digest(data))
+
+
+@app.route('/api/v1/reports', methods=['POST'])
+def submit_report_api():
+    payload = request.get_json(silent=True)
+    if payload is None or isinstance(payload, dict) and set(payload) == {'id'}:
+        data = stored_prediction(payload and payload['id'])
+        if not data:
+            return jsonify({'error': 'No prediction to report on'}), 404
+    elif isinstance(payload, dict):
+        try:
+            data = report_payload(payload)
+        except (TypeError, ValueError) as exc:
+            return jsonify({'error': f'Invalid prediction: {exc}'}), 400
+    else:
+        return jsonify({'error': 'Expected a JSON prediction object'}), 400
+
+    job = REPORT_QUEUE.submit(data)
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = url_for('report_status_api', job_id=job.id)
+    return response
+
+
+@app.route('/api/v1/reports/bulk', methods=['POST'])
+def bulk_report_api():
+    payload = request.get_json(silent=True)
+    records = payload.get('predictions') if isinstance(payload,
+                                                      dict) else payload
+    if not isinstance(records, list) or not all(
+            isinstance(record, (dict, str)) for record in records):
+        return jsonify({
+            'error': 'Expected a JSON list of predictions or prediction ids, '
+                     'or an object with a "predictions" list'
+        }), 400
+    if not records:
+        return jsonify({'error': 'No predictions to report on'}), 400
+    if len(records) > REPORT_BULK_MAX:
+        return jsonify({
+            'error': f'At most {REPORT_BULK_MAX} predictions per request'
+        }), 413
+
+    report_format = request.args.get('format') or (
+        payload.get('format') if isinstance(payload, dict) else None) or 'zip'
+    if report_format not in ('zip', 'pdf'):
+        return jsonify({'error': 'format must be "zip" or "pdf"'}), 400
+
+    predictions = []
+    for index, record in enumerate(records):
+        if isinstance(record, str):
+            data = PREDICTION_STORE.get(record)
+            if data is None:
+                return jsonify(
+                    {'error': f'Unknown prediction id at index {index}'}), 404
+            predictions.append(json.loads(data))
+            continue
+        try:
+            predictions.append(report_payload(record))
+        except (TypeError, ValueError) as exc:
+            return jsonify(
+                {'error': f'Invalid prediction at index {index}: {exc}'}), 400
+
+    if report_format == 'pdf':
+        # A single PDF document cannot be assembled from parts rendered
+        # elsewhere, so the merged report renders as one job on the pool.
+        future = get_report_pool().submit(generate_merged_report, predictions)
+        try:
+            body = future.result(timeout=REPORT_BULK_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            response = jsonify(
+                {'error': 'The merged report is taking too long to render'})
+            response.status_code = 503
+            response.headers['Retry-After'] = '30'
+            return response
+        archive_report(body, 'cohort')
+        return send_file(io.BytesIO(body),
+                         mimetype='application/pdf',
+                         as_attachment=True,
+                         download_name='cohort_prediction_report.pdf')
+
+    response = Response(stream_report_zip(predictions),
+                        mimetype='application/zip')
+    response.headers['Content-Disposition'] = (
+        'attachment; filename=cohort_prediction_reports.zip')
+    return response
+
+
+@app.route('/api/v1/reports/<job_id>')
+def report_status_api(job_id):
+    job = REPORT_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown report job'}), 404
+    return jsonify(job.to_dict())
 
-    return send_file(pdf_file,
-                     as_attachment=True,
-                     download_name=f"{data['disease']}_prediction_report.pdf")
+
+@app.route('/api/v1/reports/<job_id>/pdf')
+def report_download_api(job_id):
+    job = REPORT_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown report job'}), 404
+    status = job.status
+    if status in ('queued', 'running'):
+        response = jsonify(job.to_dict())
+        response.status_code = 202
+        response.headers['Retry-After'] = '1'
+        return response
+    if status == 'failed':
+        return jsonify(job.to_dict()), 500
+    return report_response(job.data, job.id)
 
 
 @app.route('/download/source')
@@ -2050,39 +4420,266 @@ def download_source():
 
 @app.route('/download/csv')
 def download_csv():
-    data = session.get('last_prediction') or LAST_PREDICTION_CACHE.get(
-        'latest')
+    data = stored_prediction(request.args.get('id'))
     if not data:
         return "No prediction data found. Please complete a disease assessment first.", 404
 
-    csv_data = {
-        'Name': [data['patient_data']['name']],
-        'Age': [data['patient_data']['age']],
-        'Gender': [data['patient_data']['gender']],
-        'Disease': [data['disease'].title()],
-        'Prediction': ['Positive' if data['prediction'] == 1 else 'Negative'],
-        'Risk_Probability_%': [data['probability'] * 100],
-        'Risk_Level': [data['risk_level'].upper()],
-        'Timestamp': [datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
+    if request.args.get('history') == '1':
+        predictions = session.get('prediction_history') or [data]
+        download_name = 'prediction_history.csv'
+    else:
+        predictions = [data]
+        download_name = f"{data['disease']}_prediction_data.csv"
+
+    # Form fields beyond the patient details become extra columns, in the
+    # order they first appear across the exported predictions. History
+    # entries come back from the session with their keys sorted, so each
+    # prediction's fields are taken in its model's feature order first.
+    input_columns = []
+    for prediction in predictions:
+        input_data = prediction['input_data']
+        keys = [
+            column for column in FEATURE_COLUMNS.get(prediction['disease'], ())
+            if column in input_data
+        ]
+        keys += [key for key in input_data if key not in keys]
+        for key in keys:
+            if key not in CSV_PATIENT_FIELDS and key not in input_columns:
+                input_columns.append(key)
+
+    response = Response(stream_csv(
+        CSV_EXPORT_COLUMNS + tuple(input_columns),
+        (prediction_csv_row(prediction, input_columns)
+         for prediction in predictions)),
+                        mimetype='text/csv')
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename={download_name}')
+    return response
+
+
+def create_app():
+    # Gunicorn calls this once in the master (preload_app) so the models are
+    # loaded before the workers fork and share the same pages.
+    if ACTIVE_MODEL_VERSION is None:
+        load_models()
+        fingerprint_assets()
+        compile_templates()
+        prerender_pages()
+    return app
+
+
+def benchmark_templates(rounds=200):
+    # Render cost per page template, compiling the source on every render
+    # (render_template_string, as the routes used to) against rendering the
+    # template compiled once by the registry. Returns {name: (before, after)}
+    # in microseconds.
+    patient_data = {'name': 'Jane Doe', 'age': '52', 'gender': 'Female'}
+    results = screen_patient({
+        'age': 52,
+        'gender': 'Female',
+        'pregnancies': 2,
+        'glucose': 148,
+        'blood_pressure': 72,
+        'skin_thickness': 35,
+        'insulin': 94,
+        'bmi': 31.5,
+        'dpf': 0.63
+    })
+    for disease, result in results.items():
+        if result['assessed']:
+            result['recommendations'] = get_recommendations(
+                disease, result['risk_level'], result['probability'], {})
+    contexts = {
+        'result.html': {
+            'patient_data': patient_data,
+            'disease': 'diabetes',
+            'prediction': 1,
+            'probability': 0.74,
+            'risk_level': 'high',
+            'recommendations': get_recommendations('diabetes', 'high', 0.74, {
+                'glucose': 148,
+                'bmi': 31.5
+            }),
+            'gauge_url': '/chart/gauge/diabetes/74.svg',
+            'prediction_id': 'benchmark'
+        },
+        'screening_result.html': {
+            'patient_data': patient_data,
+            'results': results,
+            'screening_chart_url': '/chart/screening.svg?diabetes=74'
+        }
     }
 
-    for key, value in data['input_data'].items():
-        if key not in ['name', 'age', 'gender']:
-            csv_data[key] = [value]
+    timings = {}
+    with app.test_request_context():
+        for name, source in TEMPLATES.items():
+            context = contexts.get(name, {})
+            before = time.perf_counter()
+            for _ in range(rounds):
+                render_template_string(source, **context)
+            after = time.perf_counter()
+            for _ in range(rounds):
+                render_template(name, **context)
+            done = time.perf_counter()
+            timings[name] = ((after - before) / rounds * 1e6,
+                             (done - after) / rounds * 1e6)
+    return timings
 
-    df = pd.DataFrame(csv_data)
 
-    csv_file = f'reports/{data["disease"]}_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    os.makedirs('reports', exist_ok=True)
-    df.to_csv(csv_file, index=False)
+# Libraries only needed off the request path; importing any of them while
+# loading the app pushes cold start well past the budget.
+DEFERRED_IMPORTS = ('sklearn', 'pandas', 'fpdf')
 
-    return send_file(csv_file,
-                     as_attachment=True,
-                     download_name=f"{data['disease']}_prediction_data.csv")
 
+def measure_import_time():
+    # Import the app in a fresh interpreter so nothing is already cached in
+    # sys.modules, and return {top-level module: cumulative microseconds}.
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True)
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        if '.' not in name:
+            timings[name] = timings.get(name, 0) + int(fields[1])
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='app.py')
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve_parser = subparsers.add_parser('serve',
+                                         help='run the development server')
+    serve_parser.add_argument('--host', default='0.0.0.0')
+    serve_parser.add_argument('--port', type=int, default=5000)
+
+    build_parser = subparsers.add_parser(
+        'build-models', help='train the models and publish a new version')
+    build_parser.add_argument('--version')
+
+    subparsers.add_parser(
+        'verify-models',
+        help='check the fused models against the two-step sklearn path')
+
+    score_parser = subparsers.add_parser(
+        'score', help='score a CSV file offline across a process pool')
+    score_parser.add_argument('--disease',
+                              required=True,
+                              choices=sorted(FEATURE_COLUMNS))
+    score_parser.add_argument('--workers',
+                              type=int,
+                              help='worker processes (default: all cores)')
+    score_parser.add_argument('--chunk-size',
+                              type=int,
+                              default=CSV_CHUNK_ROWS,
+                              help='rows per shard')
+    score_parser.add_argument('input')
+    score_parser.add_argument('output')
+
+    store_parser = subparsers.add_parser(
+        'store-server',
+        help='run a local Redis-protocol stand-in for the redis backends')
+    store_parser.add_argument('--host', default='127.0.0.1')
+    store_parser.add_argument('--port', type=int, default=6379)
+    store_parser.add_argument('--max-keys',
+                              type=int,
+                              default=PREDICTION_STORE_SIZE + SESSION_STORE_SIZE)
+
+    bench_parser = subparsers.add_parser(
+        'bench-templates',
+        help='compare per-render cost of compiled and uncompiled templates')
+    bench_parser.add_argument('--rounds', type=int, default=200)
+
+    import_parser = subparsers.add_parser(
+        'check-import-time',
+        help='fail if importing the app exceeds the cold start budget')
+    import_parser.add_argument(
+        '--budget-ms',
+        type=float,
+        default=float(os.environ.get('IMPORT_TIME_BUDGET_MS', '1000')))
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build-models':
+        version = build_model_store(args.version)
+        print(f'Published model version {version} to {MODEL_STORE_DIR}')
+        return
+
+    if args.command == 'verify-models':
+        load_models()
+        for disease, max_diff in verify_compiled_models().items():
+            print(f'{disease}: max probability difference {max_diff:.4f}')
+        return
+
+    if args.command == 'score':
+        import pandas as pd
+
+        try:
+            header = pd.read_csv(args.input, dtype=str, nrows=0)
+        except pd.errors.EmptyDataError:
+            parser.error(f'{args.input} is empty')
+        # Like the web endpoint, refuse a roster that lacks a model column
+        # instead of writing every row out as invalid.
+        missing = missing_frame_columns(args.disease, header)
+        if missing:
+            parser.error(f'{args.input} lacks columns: {", ".join(missing)}')
+
+        load_models()
+        rows = score_file(args.disease, args.input, args.output,
+                          args.workers, args.chunk_size)
+        print(f'Scored {rows} rows for {args.disease} into {args.output}')
+        return
+
+    if args.command == 'store-server':
+        print(f'Serving the Redis protocol on {args.host}:{args.port}')
+        serve_store(args.host, args.port, args.max_keys)
+        return
+
+    if args.command == 'bench-templates':
+        create_app()
+        print(f'{"template":<24}{"from source":>14}{"compiled":>12}')
+        for name, (before, after) in benchmark_templates(args.rounds).items():
+            print(f'{name:<24}{before:>11.0f} us{after:>9.0f} us')
+        return
+
+    if args.command == 'check-import-time':
+        timings = measure_import_time()
+        total_ms = timings['app'] / 1000
+        deferred = sorted(name for name in DEFERRED_IMPORTS if name in timings)
+        print(f'import app: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)')
+        if total_ms <= args.budget_ms and not deferred:
+            return
+        for name, usec in sorted(timings.items(),
+                                 key=lambda item: item[1],
+                                 reverse=True)[:10]:
+            print(f'  {usec / 1000:8.1f} ms  {name}')
+        if deferred:
+            sys.exit(f'Imported at startup: {", ".join(deferred)}')
+        sys.exit('Import time is over budget')
+
+    create_app()
+    app.run(host=getattr(args, 'host', '0.0.0.0'),
+            port=getattr(args, 'port', 5000),
+            debug=False)
 
-# Train models on startup (ensure this runs when imported by Gunicorn)
-train_models()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    main()
+else:
+    # Load the persisted models on import so `gunicorn app:app` keeps working;
+    # training only happens through `python app.py build-models`. Processes
+    # spawned by a multiprocessing pool only need the module's functions and
+    # set up what they use themselves (spawn names them before importing).
+    multiprocessing = sys.modules.get('multiprocessing')
+    if (multiprocessing is None or
+            multiprocessing.current_process().name == 'MainProcess'):
+        create_app()
@@ -0,0 +1,28 @@
+import gc
+import os
+
+wsgi_app = 'app:create_app()'
+
+# Load the models once in the master; workers inherit them copy-on-write.
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+# Threaded workers let concurrent predictions for the same disease meet in
+# the app's micro-batching scheduler (BATCH_WINDOW_MS / BATCH_MAX_SIZE).
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Keep the collector out of the master while the models are loaded so it
+# does not leave freed holes between the model objects, then freeze
+# everything that exists at fork time into the permanent generation. The
+# workers' collections then never touch those objects' GC headers, so the
+# pages holding the forests stay shared instead of being copied per worker.
+gc.disable()
+
+
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()